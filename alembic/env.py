@@ -5,10 +5,12 @@ from sqlalchemy import pool
 
 from alembic import context
 from app.core.database import Base
+from app.core.config import DATABASE_URL
 from app.auth import models as auth_models
 from app.products import models as product_models
 from app.cart import models as cart_models
 from app.orders import models as order_models
+from app.emails import models as email_models
 
 
 # this is the Alembic Config object, which provides
@@ -20,6 +22,9 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# the database URL comes from the app config (DATABASE_URL), not alembic.ini
+config.set_main_option("sqlalchemy.url", DATABASE_URL)
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
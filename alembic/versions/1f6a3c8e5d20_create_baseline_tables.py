@@ -0,0 +1,121 @@
+"""Create baseline tables
+
+Revision ID: 1f6a3c8e5d20
+Revises: 22754ecd49c9
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6a3c8e5d20'
+down_revision: Union[str, None] = '22754ecd49c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+## the tables as the app first created them with Base.metadata.create_all; databases
+## that already have them (created by the app before the schema moved to Alembic) keep them
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('email', sa.String(), nullable=True),
+            sa.Column('hashed_password', sa.String(), nullable=True),
+            sa.Column('role', sa.Enum('admin', 'user', name='roleenum'), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+        op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    if not inspector.has_table('products'):
+        op.create_table(
+            'products',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('description', sa.String(), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('stock', sa.Integer(), nullable=False),
+            sa.Column('category', sa.String(), nullable=False),
+            sa.Column('image_url', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_products_id'), 'products', ['id'], unique=False)
+
+    if not inspector.has_table('password_reset_tokens'):
+        op.create_table(
+            'password_reset_tokens',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('token', sa.String(), nullable=False),
+            sa.Column('expiration_time', sa.DateTime(), nullable=False),
+            sa.Column('used', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('token'),
+        )
+        op.create_index(op.f('ix_password_reset_tokens_id'), 'password_reset_tokens', ['id'], unique=False)
+
+    if not inspector.has_table('cart'):
+        op.create_table(
+            'cart',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('product_id', sa.Integer(), nullable=True),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_cart_id'), 'cart', ['id'], unique=False)
+        op.create_index(op.f('ix_cart_user_id'), 'cart', ['user_id'], unique=False)
+
+    if not inspector.has_table('orders'):
+        op.create_table(
+            'orders',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('total_amount', sa.Float(), nullable=True),
+            sa.Column('status', sa.Enum('PENDING', 'PAID', 'CANCELLED', name='orderstatus'), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if not inspector.has_table('order_items'):
+        op.create_table(
+            'order_items',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=True),
+            sa.Column('product_id', sa.Integer(), nullable=True),
+            sa.Column('product_name', sa.String(), nullable=True),
+            sa.Column('quantity', sa.Integer(), nullable=True),
+            sa.Column('price_at_purchase', sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='SET NULL'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('order_items')
+    op.drop_table('orders')
+    op.drop_index(op.f('ix_cart_user_id'), table_name='cart')
+    op.drop_index(op.f('ix_cart_id'), table_name='cart')
+    op.drop_table('cart')
+    op.drop_index(op.f('ix_password_reset_tokens_id'), table_name='password_reset_tokens')
+    op.drop_table('password_reset_tokens')
+    op.drop_index(op.f('ix_products_id'), table_name='products')
+    op.drop_table('products')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,43 @@
+"""Add price to the product availability projection
+
+Revision ID: 3c9e7a1f5b2d
+Revises: b6e2d8f4a0c7
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.products import availability
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e7a1f5b2d'
+down_revision: Union[str, None] = 'b6e2d8f4a0c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    availability.drop_availability_sync(bind)
+    op.add_column('product_availability', sa.Column('price', sa.Float(), nullable=True))
+    op.execute(availability.BACKFILL_PRICE)
+    with op.batch_alter_table('product_availability') as batch_op:
+        batch_op.alter_column('price', existing_type=sa.Float(), nullable=False)
+    op.create_index('ix_product_availability_in_stock_price', 'product_availability', ['in_stock', 'price', 'product_id'], unique=False)
+    # triggers that also copy price changes
+    availability.create_availability_sync(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    availability.drop_availability_sync(bind)
+    op.drop_index('ix_product_availability_in_stock_price', table_name='product_availability')
+    with op.batch_alter_table('product_availability') as batch_op:
+        batch_op.drop_column('price')
+    availability.create_availability_sync(bind, price=False)
@@ -0,0 +1,31 @@
+"""Add product full-text search index
+
+Revision ID: 5b8e1f0a9c3d
+Revises: 1f6a3c8e5d20
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.products import search
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f0a9c3d'
+down_revision: Union[str, None] = '1f6a3c8e5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite: FTS5 table + sync triggers, PostgreSQL: GIN tsvector index
+    search.create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    search.drop_search_index(op.get_bind())
@@ -0,0 +1,37 @@
+"""Add unique cart (user_id, product_id) index
+
+Revision ID: a4d9e2b6c8f1
+Revises: f3a8c1d5e7b2
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9e2b6c8f1'
+down_revision: Union[str, None] = 'f3a8c1d5e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    ## merge duplicate lines into the oldest one before the index can be unique
+    op.execute("""
+        UPDATE cart SET quantity = (
+            SELECT SUM(c2.quantity) FROM cart c2
+            WHERE c2.user_id = cart.user_id AND c2.product_id = cart.product_id
+        )
+        WHERE id IN (SELECT MIN(id) FROM cart GROUP BY user_id, product_id HAVING COUNT(*) > 1)
+    """)
+    op.execute("DELETE FROM cart WHERE id NOT IN (SELECT MIN(id) FROM cart GROUP BY user_id, product_id)")
+    op.create_index('uq_cart_user_product', 'cart', ['user_id', 'product_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_cart_user_product', table_name='cart')
@@ -0,0 +1,44 @@
+"""Add product availability projection
+
+Revision ID: b6e2d8f4a0c7
+Revises: a4d9e2b6c8f1
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.products import availability
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d8f4a0c7'
+down_revision: Union[str, None] = 'a4d9e2b6c8f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_availability',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('available', sa.Integer(), nullable=False),
+    sa.Column('reserved', sa.Integer(), nullable=False),
+    sa.Column('in_stock', sa.Boolean(), nullable=False),
+    sa.Column('stock_level', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_product_availability_in_stock', 'product_availability', ['in_stock', 'product_id'], unique=False)
+    # sync triggers on products + backfill of the existing products (the projection
+    # without its price column, added in 3c9e7a1f5b2d)
+    availability.create_availability_sync(op.get_bind(), price=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    availability.drop_availability_sync(op.get_bind())
+    op.drop_index('ix_product_availability_in_stock', table_name='product_availability')
+    op.drop_table('product_availability')
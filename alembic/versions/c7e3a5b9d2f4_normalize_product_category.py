@@ -0,0 +1,44 @@
+"""Normalize product category and index listing filters
+
+Revision ID: c7e3a5b9d2f4
+Revises: 9d2c4e6f8a1b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.products.models import normalize_category
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a5b9d2f4'
+down_revision: Union[str, None] = '9d2c4e6f8a1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('category_key', sa.String(), nullable=False, server_default=''))
+
+    # backfill with the same normalization the model applies on write
+    conn = op.get_bind()
+    products = sa.table('products', sa.column('id'), sa.column('category'), sa.column('category_key'))
+    rows = conn.execute(sa.select(products.c.id, products.c.category)).all()
+    if rows:
+        conn.execute(
+            products.update().where(products.c.id == sa.bindparam('row_id')).values(category_key=sa.bindparam('key')),
+            [{'row_id': row.id, 'key': normalize_category(row.category)} for row in rows],
+        )
+
+    op.create_index('ix_products_category_price', 'products', ['category_key', 'price'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_category_price', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('category_key')
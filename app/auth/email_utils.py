@@ -1,15 +1,8 @@
-import smtplib
-from email.message import EmailMessage
-from app.core.config import EMAIL_USER, EMAIL_PASSWORD
+from app.emails import outbox
 
-## function for sending reset token
-def send_reset_email(to_email: str, token: str):
-    msg = EmailMessage()
-    msg["Subject"] = "Your Password Reset Token"
-    msg["From"] = EMAIL_USER
-    msg["To"] = to_email
+RESET_EMAIL_SUBJECT = "Your Password Reset Token"
 
-    msg.set_content(f"""
+RESET_EMAIL_BODY = """
 Hello,
 
 You requested to reset your password.
@@ -20,12 +13,8 @@ Here is your secure token:
 Use this token in the /auth/reset-password endpoint to set your new password.
 
 Thank you.
-""")
+"""
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(EMAIL_USER, EMAIL_PASSWORD)
-            smtp.send_message(msg)
-            print(f"Password reset email sent to {to_email}")
-    except Exception as e:
-        print(f" Failed to send email to {to_email}: {e}")
+## queue the reset token email; the outbox worker sends it over SMTP after the commit
+def queue_reset_email(db, to_email: str, token: str):
+    outbox.enqueue(db, to_email, RESET_EMAIL_SUBJECT, RESET_EMAIL_BODY.format(token=token))
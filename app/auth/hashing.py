@@ -0,0 +1,66 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from app.auth import utils
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_RETRY_AFTER
+from app.core.metrics import Histogram
+
+## bcrypt runs on its own size-limited thread pool (bcrypt releases the GIL), so a
+## login storm queues here instead of occupying the threadpool catalog requests use.
+## Once PASSWORD_HASH_MAX_PENDING operations are queued, new ones get a 503.
+
+HASH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+latency = {
+    "hash": Histogram(HASH_BUCKETS),
+    "verify": Histogram(HASH_BUCKETS),
+}
+rejected = 0
+
+_executor = None
+_pending = 0
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+async def _run(operation: str, fn, *args):
+    global _pending, rejected
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+        )
+
+    _pending += 1
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+        latency[operation].observe(time.perf_counter() - start)
+
+
+async def hash_password(password: str):
+    return await _run("hash", utils.hash_password, password)
+
+
+async def verify_password(plain: str, hashed: str):
+    return await _run("verify", utils.verify_password, plain, hashed)
+
+
+def stats():
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "pending": _pending,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "rejected": rejected,
+        "latency_seconds": {operation: histogram.snapshot() for operation, histogram in latency.items()},
+    }
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event
+from app.auth import models
+from app.core import events
+from app.core.config import IDENTITY_CACHE_TTL, IDENTITY_CACHE_SIZE
+
+## Bounded TTL/LRU cache of authenticated users keyed by the token subject (email),
+## so get_current_user does not query the users table on every request.
+
+
+## immutable, session-independent view of the user returned by get_current_user
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    id: int
+    name: str
+    email: str
+    role: str
+
+    @classmethod
+    def from_model(cls, user: models.User):
+        role = user.role.value if isinstance(user.role, models.RoleEnum) else user.role
+        return cls(id=user.id, name=user.name, email=user.email, role=role)
+
+    ## from access-token claims (sub, uid, name, role); None for tokens issued without them
+    @classmethod
+    def from_claims(cls, claims: dict):
+        try:
+            return cls(id=int(claims["uid"]), name=claims["name"], email=claims["sub"], role=claims["role"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class IdentityCache:
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str):
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, subject: str, user: CurrentUser):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+identity_cache = IdentityCache(ttl=IDENTITY_CACHE_TTL, maxsize=IDENTITY_CACHE_SIZE)
+
+
+## Invalidation hooks: a password reset or role change must not be served from the cache.
+## The event drops the entry in the other workers too.
+def invalidate_user(email: str):
+    identity_cache.invalidate(email)
+    events.publish_threadsafe("identity", email)
+
+
+events.subscribe("identity", identity_cache.invalidate)
+
+
+@event.listens_for(models.User.role, "set")
+@event.listens_for(models.User.hashed_password, "set")
+def on_identity_change(target, value, oldvalue, initiator):
+    if target.email:
+        invalidate_user(target.email)
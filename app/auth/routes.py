@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.auth import schemas, utils, models, email_utils
-from app.core.database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import schemas, utils, models, email_utils, hashing
+from app.auth.identity_cache import invalidate_user
+from app.emails import outbox
 from fastapi.responses import JSONResponse
 from datetime import datetime, timezone
 from app.utils.dependency import get_db, get_current_user, require_admin
@@ -17,18 +19,19 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 #create user & admin
 @router.post("/signup", status_code=201)
-def signup(data: schemas.Signup, db: Session = Depends(get_db)):
+async def signup(data: schemas.Signup, db: AsyncSession = Depends(get_db)):
     try:
-        user=db.query(models.User).filter_by(email=data.email).first()
+        result = await db.execute(select(models.User).filter_by(email=data.email))
+        user = result.scalars().first()
 
         if (user):
             raise HTTPException(status_code=400, detail="Email already exists")
         
-        hashed_pw = utils.hash_password(data.password)
+        hashed_pw = await hashing.hash_password(data.password)
         user = models.User(name=data.name, email=data.email, hashed_password=hashed_pw, role=data.role)
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         logger.info(f"User created successfully: {data.email}")
         return {"message": "User created successfully"}
     
@@ -36,23 +39,24 @@ def signup(data: schemas.Signup, db: Session = Depends(get_db)):
          raise http_exc
      
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error in signup: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
     
 
 ##login user & admin
 @router.post("/signin", response_model=schemas.Token)
-def signin(data: schemas.Signin, db: Session = Depends(get_db)):
+async def signin(data: schemas.Signin, db: AsyncSession = Depends(get_db)):
     try:
-        user = db.query(models.User).filter_by(email=data.email).first()
+        result = await db.execute(select(models.User).filter_by(email=data.email))
+        user = result.scalars().first()
 
-        if not user or not utils.verify_password(data.password, user.hashed_password):
+        if not user or not await hashing.verify_password(data.password, user.hashed_password):
             logger.warning(f"Failed login attempt for email: {data.email}")
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         logger.info(f" Successful login for email: {data.email}")
-        payload = {"sub": user.email, "role": user.role}
+        payload = {"sub": user.email, "role": user.role, "uid": user.id, "name": user.name}
         access_token = utils.create_access_token(payload)
         refresh_token = utils.create_refresh_token(payload)
 
@@ -67,34 +71,38 @@ def signin(data: schemas.Signin, db: Session = Depends(get_db)):
 
 ## forget password    
 @router.post("/forgot-password")
-def forgot_password(data: schemas.ForgotPasswordRequest, db: Session = Depends(get_db)):
+async def forgot_password(data: schemas.ForgotPasswordRequest, db: AsyncSession = Depends(get_db)):
     try:
-        user = db.query(models.User).filter_by(email=data.email).first()
+        result = await db.execute(select(models.User).filter_by(email=data.email))
+        user = result.scalars().first()
         if (not user):
             logger.warning("Email not found for password reset")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Email not found. Please check and try again.")
         
         reset_token = utils.create_and_store_password_reset_token(db, user)
 
-        ## Send the reset token via mail us SMTP
-        email_utils.send_reset_email(user.email, reset_token)
-        logger.info("Reset token sent to email") 
+        ## Queue the reset token mail; the outbox worker sends it via SMTP
+        email_utils.queue_reset_email(db, user.email, reset_token)
+        await db.commit()
+        outbox.notify()
+        logger.info("Reset token queued for email") 
         return {"message": "Reset token mail send Successfully."}
     
     except HTTPException as http_exc:
          raise http_exc
      
     except Exception as e:
-        db.rollback(f"Error in Forget password: {str(e)}")
-        logger.error()
+        await db.rollback()
+        logger.error(f"Error in Forget password: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # reset password 
 @router.post("/reset-password")
-def reset_password(data: schemas.ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(data: schemas.ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
     try:
-        db_token = db.query(models.PasswordResetToken).filter_by(token=data.token).first()
+        result = await db.execute(select(models.PasswordResetToken).filter_by(token=data.token))
+        db_token = result.scalars().first()
 
         if not db_token:
             logger.warning("Invalid reset token used")
@@ -108,13 +116,14 @@ def reset_password(data: schemas.ResetPasswordRequest, db: Session = Depends(get
             logger.warning("Reset token expired")
             raise HTTPException(status_code=400, detail="Token expired")
 
-        user = db_token.user
-        hashed_pw = utils.hash_password(data.new_password)
+        user = await db.get(models.User, db_token.user_id)
+        hashed_pw = await hashing.hash_password(data.new_password)
         user.hashed_password = hashed_pw
 
         # Mark token as used
         db_token.used = True
-        db.commit()
+        await db.commit()
+        invalidate_user(user.email)
         logger.info("Password reset successfully")
         return {"message": "Password reset successful"}
     
@@ -122,13 +131,13 @@ def reset_password(data: schemas.ResetPasswordRequest, db: Session = Depends(get
          raise http_exc
       
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error in reset-password: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 ## refresh token
 @router.post("/refresh-token", response_model=schemas.Token)
-def refresh_token(data: schemas.RefreshTokenRequest):
+async def refresh_token(data: schemas.RefreshTokenRequest):
     try:
         payload = utils.decode_token(data.refresh_token)
 
@@ -136,12 +145,11 @@ def refresh_token(data: schemas.RefreshTokenRequest):
             logger.warning("Invalid refresh token: payload is None or invalid format")
             raise HTTPException(status_code=401, detail="Invalid refresh token")
         
-        email = payload.get("sub")
-        role = payload.get("role")
+        claims = {key: payload[key] for key in ("sub", "role", "uid", "name") if key in payload}
 
         logger.info("Refresh token")  
-        new_access_token = utils.create_access_token({"sub": email, "role": role})
-        new_refresh_token = utils.create_refresh_token({"sub": email, "role": role})
+        new_access_token = utils.create_access_token(claims)
+        new_refresh_token = utils.create_refresh_token(claims)
 
         return {"access_token": new_access_token, "refresh_token": new_refresh_token}
     
@@ -0,0 +1,142 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from jose.exceptions import JWTError, ExpiredSignatureError
+from app.core.config import SECRET_KEY, ALGORITHM, JWT_BACKEND, TOKEN_CACHE_SIZE
+
+## Access-token verification for get_current_user.
+## A verified token's claims are cached under the token's SHA-256 until the token's
+## own `exp`, so a token reused for many calls is verified once. The verifier is
+## selectable (JWT_BACKEND); every backend raises jose's JWTError on failure.
+## Verifier libraries are imported when the first token is verified.
+
+HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+def decode_jose(token: str):
+    from jose import jwt
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def b64decode(segment: str):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+## stdlib HS* verifier: algorithm, signature, exp and nbf (the claims our tokens use)
+def decode_hmac(token: str):
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, payload_segment = signing_input.split(".")
+        header = json.loads(b64decode(header_segment))
+        payload = json.loads(b64decode(payload_segment))
+        signature = b64decode(signature)
+    except (ValueError, TypeError) as e:
+        raise JWTError("Invalid token") from e
+
+    if not isinstance(header, dict) or header.get("alg") != ALGORITHM or ALGORITHM not in HMAC_DIGESTS:
+        raise JWTError("The specified alg value is not allowed")
+    expected = hmac.new(SECRET_KEY.encode(), signing_input.encode(), HMAC_DIGESTS[ALGORITHM]).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise JWTError("Signature verification failed.")
+    if not isinstance(payload, dict):
+        raise JWTError("Invalid payload")
+
+    now = time.time()
+    for claim in ("exp", "nbf"):
+        if claim in payload and not isinstance(payload[claim], (int, float)):
+            raise JWTError(f"Invalid {claim} claim")
+    if "exp" in payload and payload["exp"] < now:
+        raise ExpiredSignatureError("Signature has expired.")
+    if "nbf" in payload and payload["nbf"] > now:
+        raise JWTError("The token is not yet valid (nbf)")
+    return payload
+
+
+def pyjwt_decoder():
+    try:
+        import jwt as pyjwt
+    except ImportError as e:
+        raise RuntimeError("JWT_BACKEND=pyjwt requires the 'PyJWT' package") from e
+
+    def decode_pyjwt(token: str):
+        try:
+            return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e)) from e
+
+    return decode_pyjwt
+
+
+def select_decoder(name: str):
+    if name == "jose":
+        return decode_jose
+    if name == "hmac":
+        return decode_hmac
+    if name == "pyjwt":
+        return pyjwt_decoder()
+    raise ValueError(f"Unknown JWT_BACKEND: {name}")
+
+
+decode = select_decoder(JWT_BACKEND)
+
+
+class TokenCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    ## only tokens with a numeric exp are cached; the entry dies with the token
+    def put(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (claims, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"backend": JWT_BACKEND, "size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(maxsize=TOKEN_CACHE_SIZE)
+
+
+## verified claims of an access token (cached); raises JWTError. Treat the result as read-only.
+def decode_access_token(token: str):
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode(token)
+        token_cache.put(token, claims)
+    return claims
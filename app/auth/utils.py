@@ -1,26 +1,38 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta,timezone
-from jose import jwt, JWTError
+from jose.exceptions import JWTError
 from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 import secrets
 from app.auth import models
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+## passlib/bcrypt and jose (with cryptography) are imported on first use, not at worker start
+_pwd_context = None
+
+def pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+def jose_jwt():
+    from jose import jwt
+    return jwt
 
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    return pwd_context().verify(plain, hashed)
 
 #Create access token
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jose_jwt().encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+## the token row is committed by the caller, together with the queued email
 def create_and_store_password_reset_token(db, user):
     token = secrets.token_urlsafe(32)  # Secure random token
     expiration = datetime.now(timezone.utc) + timedelta(minutes=5)
@@ -33,19 +45,17 @@ def create_and_store_password_reset_token(db, user):
         used=False
     )
     db.add(reset_token)
-    db.commit()
-    db.refresh(reset_token)
 
     return token
 
 def verify_password_reset_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jose_jwt().decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             return None
         return email
-    except jwt.JWTError:
+    except JWTError:
         return None
 
 #Create refresh token
@@ -53,11 +63,11 @@ def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jose_jwt().encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 # Decode Token (both access/refresh)
 def decode_token(token: str):
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return jose_jwt().decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
\ No newline at end of file
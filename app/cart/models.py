@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
@@ -10,4 +10,9 @@ class CartItem(Base):
     quantity = Column(Integer, nullable=False)
 
     #relationship 
-    product = relationship("Product", back_populates="cart_items") 
\ No newline at end of file
+    product = relationship("Product", back_populates="cart_items")
+
+    ## one line per product per user; conflict target of the add-to-cart upsert
+    __table_args__ = (
+        Index("uq_cart_user_product", "user_id", "product_id", unique=True),
+    )
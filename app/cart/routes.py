@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException 
-from sqlalchemy.orm import Session
-from app.cart import models, schemas
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cart import models, schemas, store
 from app.utils.dependency import get_db, require_user
-from app.products.models import Product
 from app.cart.models import CartItem
 import logging
 
@@ -12,45 +12,40 @@ router = APIRouter(prefix="/cart", tags=["Cart"])
 
 #view item of cart
 @router.get("/", response_model=list[schemas.CartItemOut])
-def view_cart(db: Session = Depends(get_db),user=Depends(require_user)):
+async def view_cart(db: AsyncSession = Depends(get_db),user=Depends(require_user)):
     try:
-        cart_items = db.query(CartItem).filter_by(user_id=user.id).all()
+        result = await db.execute(select(CartItem).filter_by(user_id=user.id))
+        cart_items = result.scalars().all()
         logger.info(f"Fetched cart items for user {user.id}")
         return cart_items
     except Exception as e:
         logger.error(f"Error viewing cart for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Something went wrong while fetching the cart")
 
-## add item in cart
+## priced cart: lines with product name, price, stock status and subtotals in one query
+@router.get("/priced", response_model=schemas.PricedCartOut)
+async def view_priced_cart(db: AsyncSession = Depends(get_db), user=Depends(require_user)):
+    try:
+        cart = await store.priced_cart(db, user.id)
+        logger.info(f"Fetched priced cart for user {user.id}")
+        return cart
+    except Exception as e:
+        logger.error(f"Error viewing priced cart for user {user.id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Something went wrong while fetching the cart")
+
+## add item in cart (single upsert; the stock check is part of the statement)
 @router.post("/", response_model=schemas.CartItemOut)
-def add_to_cart(data: schemas.CartItemCreate,db: Session = Depends(get_db),user=Depends(require_user)):
+async def add_to_cart(data: schemas.CartItemCreate,db: AsyncSession = Depends(get_db),user=Depends(require_user)):
     try:
-        product = db.query(Product).filter_by(id=data.product_id).first()
-        if not product:
-            logger.warning("Add to cart failed - Product not found)")
-            raise HTTPException(status_code=404, detail="Product not found")
-
-        if (product.stock == 0):
-            raise HTTPException(status_code=400, detail="Product is out of stock")
-        
-        #Checks if the item already exists 
-        item = db.query(CartItem).filter_by(user_id=user.id, product_id=data.product_id).first()
-
-        if (item):
-            #update quantity.
-            if item.quantity + data.quantity > product.stock:
-                raise HTTPException(status_code=400, detail="Product is out of stock")
-            item.quantity += data.quantity
-            logger.info(f"Updated cart item quantity for user {user.id}")
-        else:
-            if (data.quantity > product.stock):
-                raise HTTPException(status_code=400, detail="Product is out of stock")
-            item = CartItem(user_id=user.id, **data.model_dump())
-            db.add(item)
-            logger.info(f"Added new item to cart for user {user.id}")
-
-        db.commit()
-        db.refresh(item)
+        item = await store.add_item(db, user.id, data.product_id, data.quantity)
+        if item is None:
+            await db.rollback()
+            status_code, detail = await store.explain_failure(db, user.id, data.product_id)
+            logger.warning(f"Add to cart failed for user {user.id}: {detail}")
+            raise HTTPException(status_code=status_code, detail=detail)
+
+        await db.commit()
+        logger.info(f"Added product {data.product_id} to cart for user {user.id}")
         return item
 
     except HTTPException as http_exc:
@@ -61,30 +56,51 @@ def add_to_cart(data: schemas.CartItemCreate,db: Session = Depends(get_db),user=
         raise HTTPException(status_code=500, detail="Something went wrong while adding to cart")
 
 
+## batch add/set/remove: one query to validate against stock, one transaction to apply.
+## Failed operations are reported per line and skipped (or abort the batch when atomic).
+@router.post("/batch", response_model=schemas.CartBatchOut)
+async def batch_update_cart(data: schemas.CartBatchRequest, db: AsyncSession = Depends(get_db), user=Depends(require_user)):
+    try:
+        product_ids = {operation.product_id for operation in data.operations}
+        state = await store.batch_state(db, user.id, product_ids)
+        results, changed = store.plan_batch(data.operations, state)
+
+        failed = sum(1 for result in results if not result["ok"])
+        applied = not (data.atomic and failed)
+        if applied and changed:
+            await store.write_lines(db, user.id, changed)
+            await db.commit()
+        else:
+            await db.rollback()
+
+        logger.info(f"Cart batch for user {user.id}: {len(results) - failed} ok, {failed} failed, applied={applied}")
+        return {"applied": applied, "results": results}
+
+    except HTTPException as http_exc:
+        raise http_exc
+
+    except Exception as e:
+        logger.error(f"Error applying cart batch for user {user.id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Something went wrong while updating the cart")
+
+
 #update particular item quantity in a cart
 @router.put("/{product_id}", response_model=schemas.CartItemOut)
-def update_quantity(
+async def update_quantity(
     product_id: int,
     data: schemas.CartItemUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_user)
 ):
     try:
-        item = db.query(CartItem).filter_by(user_id=user.id, product_id=product_id).first()
-        if not item:
-            logger.warning(f"Update failed: Item not found in cart (User: {user.id}, Product: {product_id})")
-            raise HTTPException(status_code=404, detail="Item not in cart")
-
-        product = db.query(Product).filter_by(id=product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-
-        if data.quantity > product.stock:
-            raise HTTPException(status_code=400, detail="Product is out of stock")
-
-        item.quantity = data.quantity
-        db.commit()
-        db.refresh(item)
+        item = await store.set_quantity(db, user.id, product_id, data.quantity)
+        if item is None:
+            await db.rollback()
+            status_code, detail = await store.explain_failure(db, user.id, product_id, require_line=True)
+            logger.warning(f"Update failed (User: {user.id}, Product: {product_id}): {detail}")
+            raise HTTPException(status_code=status_code, detail=detail)
+
+        await db.commit()
         logger.info(f"Updated quantity for cart item (User: {user.id}, Product: {product_id})")
         return item
 
@@ -97,19 +113,20 @@ def update_quantity(
     
 ## delete item from a cart
 @router.delete("/{product_id}")
-def remove_item(
+async def remove_item(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_user)
 ):
     try:
-        item = db.query(CartItem).filter_by(user_id=user.id, product_id=product_id).first()
+        result = await db.execute(select(CartItem).filter_by(user_id=user.id, product_id=product_id))
+        item = result.scalars().first()
         if not item:
             logger.warning(f"Remove failed: Item not found in cart Product: {product_id})")
             raise HTTPException(status_code=404, detail="Item not in cart")
 
-        db.delete(item)
-        db.commit()
+        await db.delete(item)
+        await db.commit()
         logger.info(f"Removed item from cart (User: {user.id}, Product: {product_id})")
         return {"message": "Product removed"}
 
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from typing import Annotated, Literal, Optional, Union
 
 class CartItemBase(BaseModel):
     product_id: int=Field(..., gt=0, description="Product ID must be positive")
@@ -15,4 +16,51 @@ class CartItemOut(CartItemBase):
     
     model_config = {
         "from_attributes": True
-    }
\ No newline at end of file
+    }
+## cart line priced from the product row
+class CartLineOut(BaseModel):
+    product_id: int
+    name: str
+    price: float
+    quantity: int
+    stock: int
+    in_stock: bool
+    subtotal: float
+
+class PricedCartOut(BaseModel):
+    items: list[CartLineOut]
+    total_quantity: int
+    total_amount: float
+    all_in_stock: bool
+
+
+## batch cart operations, applied in order in one transaction
+class CartBatchAdd(CartItemCreate):
+    op: Literal["add"]
+
+class CartBatchSet(CartItemUpdate):
+    op: Literal["set"]
+    product_id: int=Field(..., gt=0, description="Product ID must be positive")
+
+class CartBatchRemove(BaseModel):
+    op: Literal["remove"]
+    product_id: int=Field(..., gt=0, description="Product ID must be positive")
+
+CartBatchOperation = Annotated[Union[CartBatchAdd, CartBatchSet, CartBatchRemove], Field(discriminator="op")]
+
+class CartBatchRequest(BaseModel):
+    operations: list[CartBatchOperation] = Field(..., min_length=1, max_length=100)
+    atomic: bool = Field(False, description="Apply nothing if any operation fails")
+
+class CartBatchResult(BaseModel):
+    index: int
+    op: str
+    product_id: int
+    ok: bool
+    code: int
+    detail: Optional[str] = None
+    quantity: Optional[int] = None  # line quantity after the operation
+
+class CartBatchOut(BaseModel):
+    applied: bool
+    results: list[CartBatchResult]
@@ -0,0 +1,182 @@
+from sqlalchemy import select, update, delete, literal, and_
+from app.cart.models import CartItem
+from app.products.models import Product, ProductAvailability
+
+## Cart writes as single statements, checked against stock inside the statement:
+## add = INSERT ... SELECT FROM product_availability ON CONFLICT (user_id, product_id) DO UPDATE,
+## set = conditional UPDATE. Both use RETURNING, so a missing row means the
+## stock (or existence) check failed and explain_failure() says which.
+## Stock checks read the availability projection, not the products rows checkout
+## updates; checkout itself still decrements products.stock conditionally.
+
+CART_COLUMNS = (CartItem.id, CartItem.product_id, CartItem.quantity)
+
+
+def dialect_insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def stock_of(product_id):
+    return select(ProductAvailability.available).where(ProductAvailability.product_id == product_id).scalar_subquery()
+
+
+## add `quantity` to the line (creating it); None when the product is missing or the total exceeds stock
+async def add_item(db, user_id: int, product_id: int, quantity: int):
+    cart = CartItem.__table__
+    insert = dialect_insert(db.get_bind().dialect.name)
+    statement = insert(cart).from_select(
+        ["user_id", "product_id", "quantity"],
+        select(literal(user_id), ProductAvailability.product_id, literal(quantity))
+        .where(ProductAvailability.product_id == product_id, ProductAvailability.available >= quantity),
+    )
+    new_quantity = cart.c.quantity + statement.excluded.quantity
+    statement = statement.on_conflict_do_update(
+        index_elements=[cart.c.user_id, cart.c.product_id],
+        set_={"quantity": new_quantity},
+        where=new_quantity <= stock_of(statement.excluded.product_id),
+    ).returning(*CART_COLUMNS)
+    result = await db.execute(statement)
+    return result.first()
+
+
+## replace the line's quantity; None when the line is missing or quantity exceeds stock
+async def set_quantity(db, user_id: int, product_id: int, quantity: int):
+    result = await db.execute(
+        update(CartItem.__table__)
+        .where(
+            CartItem.user_id == user_id,
+            CartItem.product_id == product_id,
+            literal(quantity) <= stock_of(product_id),
+        )
+        .values(quantity=quantity)
+        .returning(*CART_COLUMNS)
+    )
+    return result.first()
+
+
+## (status, detail) for a failed add_item / set_quantity; only runs on the error path
+async def explain_failure(db, user_id: int, product_id: int, require_line: bool = False):
+    if require_line:
+        result = await db.execute(select(CartItem.id).filter_by(user_id=user_id, product_id=product_id))
+        if result.first() is None:
+            return 404, "Item not in cart"
+    result = await db.execute(select(Product.id).where(Product.id == product_id))
+    if result.first() is None:
+        return 404, "Product not found"
+    return 400, "Product is out of stock"
+
+
+## cart lines joined with product name, price and available stock, with subtotals, in one query
+async def priced_cart(db, user_id: int):
+    result = await db.execute(
+        select(
+            CartItem.product_id,
+            Product.name,
+            Product.price,
+            CartItem.quantity,
+            ProductAvailability.available.label("stock"),
+            (Product.price * CartItem.quantity).label("subtotal"),
+        )
+        .join(Product, Product.id == CartItem.product_id)
+        .join(ProductAvailability, ProductAvailability.product_id == CartItem.product_id)
+        .where(CartItem.user_id == user_id)
+        .order_by(CartItem.id)
+    )
+    items = [
+        {**row._mapping, "in_stock": row.stock >= row.quantity}
+        for row in result
+    ]
+    return {
+        "items": items,
+        "total_quantity": sum(item["quantity"] for item in items),
+        "total_amount": round(sum(item["subtotal"] for item in items), 2),
+        "all_in_stock": all(item["in_stock"] for item in items),
+    }
+
+
+## available stock and current cart quantity for every product in a batch, in one query
+## (row locks on PostgreSQL so the plan stays valid until commit)
+async def batch_state(db, user_id: int, product_ids):
+    statement = (
+        select(ProductAvailability.product_id, ProductAvailability.available, CartItem.quantity)
+        .outerjoin(CartItem, and_(CartItem.product_id == ProductAvailability.product_id, CartItem.user_id == user_id))
+        .where(ProductAvailability.product_id.in_(product_ids))
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        statement = statement.with_for_update(of=ProductAvailability)
+    result = await db.execute(statement)
+    return {row.product_id: (row.available, row.quantity) for row in result}
+
+
+## replay the operations in order against `state`, with the same rules and errors
+## as the single-item endpoints; returns per-line results and the changed lines
+## ({product_id: new quantity, None = removed})
+def plan_batch(operations, state):
+    stock = {product_id: entry[0] for product_id, entry in state.items()}
+    original = {product_id: entry[1] for product_id, entry in state.items() if entry[1] is not None}
+    lines = dict(original)
+    results = []
+
+    for index, operation in enumerate(operations):
+        product_id = operation.product_id
+        error = None
+
+        if operation.op == "add":
+            if product_id not in stock:
+                error = (404, "Product not found")
+            elif lines.get(product_id, 0) + operation.quantity > stock[product_id]:
+                error = (400, "Product is out of stock")
+            else:
+                lines[product_id] = lines.get(product_id, 0) + operation.quantity
+        elif operation.op == "set":
+            if product_id not in lines:
+                error = (404, "Item not in cart")
+            elif operation.quantity > stock[product_id]:
+                error = (400, "Product is out of stock")
+            else:
+                lines[product_id] = operation.quantity
+        else:
+            if product_id not in lines:
+                error = (404, "Item not in cart")
+            else:
+                del lines[product_id]
+
+        results.append({
+            "index": index,
+            "op": operation.op,
+            "product_id": product_id,
+            "ok": error is None,
+            "code": error[0] if error else 200,
+            "detail": error[1] if error else None,
+            "quantity": lines.get(product_id),
+        })
+
+    changed = {
+        product_id: lines.get(product_id)
+        for product_id in original.keys() | lines.keys()
+        if original.get(product_id) != lines.get(product_id)
+    }
+    return results, changed
+
+
+## write the planned lines: one DELETE for removed lines, one multi-row upsert for the rest
+async def write_lines(db, user_id: int, changed: dict):
+    cart = CartItem.__table__
+    removed = [product_id for product_id, quantity in changed.items() if quantity is None]
+    kept = [
+        {"user_id": user_id, "product_id": product_id, "quantity": quantity}
+        for product_id, quantity in changed.items() if quantity is not None
+    ]
+
+    if removed:
+        await db.execute(delete(cart).where(cart.c.user_id == user_id, cart.c.product_id.in_(removed)))
+    if kept:
+        statement = dialect_insert(db.get_bind().dialect.name)(cart).values(kept)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[cart.c.user_id, cart.c.product_id],
+            set_={"quantity": statement.excluded.quantity},
+        ))
@@ -1,51 +1,78 @@
 from fastapi import APIRouter, Depends, HTTPException, status 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update, insert, case
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.utils.dependency import get_db, require_user
 from app.cart.models import CartItem
 from app.products.models import Product
+from app.products import cache as catalog_cache
+from app.core import read_routing
 from app.orders.models import Order, OrderItem, OrderStatus
 
 router = APIRouter(prefix="/checkout", tags=["Checkout"])
 
 ##  endpoint of checkout where cart gets processed into an order
+## The statement count does not depend on the cart size: one IN query for the products,
+## one conditional UPDATE for all stock decrements and one bulk INSERT for the order items.
 @router.post("/")
-def checkout(db: Session = Depends(get_db), user=Depends(require_user)):
+async def checkout(db: AsyncSession = Depends(get_db), user=Depends(require_user)):
     try:
-        cart_items = db.query(CartItem).filter_by(user_id=user.id).all()
+        result = await db.execute(select(CartItem).filter_by(user_id=user.id))
+        cart_items = result.scalars().all()
         if not cart_items:
             raise HTTPException(status_code=400, detail="Empty Cart")
 
-        total = 0
-
-        # Status initially set to pending
-        order = Order(user_id=user.id, total_amount=0, status=OrderStatus.PENDING)
-        db.add(order)
-        db.flush()
-        
-        #Loop through Cart Items and process them
+        quantities = {}
         for item in cart_items:
-            product = db.query(Product).filter_by(id=item.product_id).first()
-            if not product or product.stock < item.quantity:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+        # Load every product of the cart at once (row-locked on Postgres)
+        query = select(Product).where(Product.id.in_(quantities)).order_by(Product.id)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update()
+        result = await db.execute(query)
+        products = {product.id: product for product in result.scalars().all()}
+
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if not product or product.stock < quantity:
                 raise HTTPException(status_code=400, detail="Product Out of Stock")
 
-            product.stock -= item.quantity
-            subtotal = item.quantity * product.price
-            total += subtotal
-            
-            ## creating order in DB
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item.product_id,
-                product_name=product.name,
-                quantity=item.quantity,
-                price_at_purchase=product.price
-            )
-            db.add(order_item)
+        # Atomic conditional decrement: a concurrent checkout that got there first
+        # makes `stock >= quantity` false for its rows and the rowcount comes up short
+        quantity_of = case(quantities, value=Product.id)
+        result = await db.execute(
+            update(Product)
+            .where(Product.id.in_(quantities), Product.stock >= quantity_of)
+            .values(stock=Product.stock - quantity_of)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(quantities):
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Product Out of Stock")
+
+        total = sum(quantity * products[product_id].price for product_id, quantity in quantities.items())
+
+        # Dummy payment succeeds within the same transaction, so the order is stored as paid
+        order = Order(user_id=user.id, total_amount=total, status=OrderStatus.PAID)
+        db.add(order)
+        await db.flush()
+
+        ## creating order items in DB (one executemany)
+        await db.execute(insert(OrderItem), [
+            {
+                "order_id": order.id,
+                "product_id": product_id,
+                "product_name": products[product_id].name,
+                "quantity": quantity,
+                "price_at_purchase": products[product_id].price,
+            }
+            for product_id, quantity in quantities.items()
+        ])
 
-        order.total_amount = total
-        order.status = OrderStatus.PAID  # Update status after successful payment
-        db.query(CartItem).filter_by(user_id=user.id).delete() ## clear the cart
-        db.commit()
+        await db.execute(delete(CartItem).filter_by(user_id=user.id)) ## clear the cart
+        await db.commit()
+        await catalog_cache.invalidate_products(quantities.keys())  ## stock changed
+        await read_routing.mark_written(user.email)  ## their order history reads the primary for a while
 
         return {
             "Message": "Order Placed Successfully",
@@ -58,8 +85,8 @@ def checkout(db: Session = Depends(get_db), user=Depends(require_user)):
          raise http_exc 
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Order not Placed: {str(e)}"
-        )
\ No newline at end of file
+        )
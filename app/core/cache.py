@@ -0,0 +1,336 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
+from app.core import config
+
+## Shared-state backends: cached entries, counters, locks and pub/sub events.
+## memory: TTL/LRU dict in this process (one worker only).
+## sqlite: a local database file shared by the workers of one node.
+## redis: any Redis-protocol server, shared by workers on any number of nodes.
+## Values are bytes (counters are ASCII integers, as in Redis), ttl is in seconds
+## (None = no expiry).
+
+
+class Backend:
+    ## cross-worker mutex on top of add()/delete_if(); yields False when `wait`
+    ## runs out, so callers can decide to go ahead unlocked
+    @asynccontextmanager
+    async def lock(self, name: str, ttl: float = 10.0, wait: float = 5.0):
+        key = f"lock:{name}"
+        token = uuid.uuid4().hex.encode()
+        deadline = time.monotonic() + wait
+        delay = 0.005
+        acquired = await self.add(key, token, ttl)
+        while not acquired and time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+            acquired = await self.add(key, token, ttl)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await self.delete_if(key, token)
+
+
+class MemoryBackend(Backend):
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def _get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _set(self, key: str, value: bytes, ttl):
+        self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str):
+        with self._lock:
+            return self._get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    ## set only if missing; returns True when the value was stored
+    async def add(self, key: str, value: bytes, ttl: float = None):
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    async def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    ## atomic counter; ttl applies when the counter is created
+    async def incr(self, key: str, amount: int = 1, ttl: float = None):
+        with self._lock:
+            value = int(self._get(key) or 0) + amount
+            entry = self._entries.get(key)
+            expires = entry[1] if entry is not None else (time.monotonic() + ttl if ttl else None)
+            self._entries[key] = (str(value).encode(), expires)
+            self._entries.move_to_end(key)
+            return value
+
+    ## delete only while the key still holds `value` (lock release)
+    async def delete_if(self, key: str, value: bytes):
+        with self._lock:
+            if self._get(key) != value:
+                return False
+            del self._entries[key]
+            return True
+
+    ## in-process delivery only: with one worker there is nobody else to tell
+    async def publish(self, channel: str, message: bytes):
+        for channels, callback in list(self._subscribers):
+            if channel in channels:
+                callback(channel, message)
+
+    async def listen(self, channels, callback):
+        subscriber = (set(channels), callback)
+        self._subscribers.append(subscriber)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self._subscribers.remove(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), "maxsize": self.maxsize}
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL);
+CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, message BLOB NOT NULL, created REAL NOT NULL);
+"""
+
+## a key is live while expires IS NULL OR expires >= now
+SQLITE_INCR = """
+INSERT INTO kv (key, value, expires) VALUES (:key, :amount, :expires)
+ON CONFLICT (key) DO UPDATE SET
+    value = CASE WHEN kv.expires < :now THEN :amount ELSE CAST(kv.value AS INTEGER) + :amount END,
+    expires = CASE WHEN kv.expires < :now THEN excluded.expires ELSE kv.expires END
+RETURNING value
+"""
+
+
+class SQLiteBackend(Backend):
+    def __init__(self, path: str, poll_interval: float = 0.2, event_retention: float = 60.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.event_retention = event_retention
+        self._local = threading.local()
+        self._writes = 0
+
+    ## one autocommit connection per thread; WAL lets the workers read while one writes
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SQLITE_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires IS NULL OR expires >= ?)", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return str(row[0]).encode() if isinstance(row[0], int) else row[0]
+
+    def _set(self, key: str, value: bytes, ttl):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO kv (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires",
+            (key, value, now + ttl if ttl else None),
+        )
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            conn.execute("DELETE FROM kv WHERE expires < ?", (now,))
+
+    def _add(self, key: str, value: bytes, ttl):
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO kv (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires WHERE kv.expires < ?",
+            (key, value, now + ttl if ttl else None, now),
+        )
+        return cursor.rowcount == 1
+
+    def _incr(self, key: str, amount: int, ttl):
+        now = time.time()
+        row = self._conn().execute(
+            SQLITE_INCR, {"key": key, "amount": amount, "expires": now + ttl if ttl else None, "now": now}
+        ).fetchone()
+        return int(row[0])
+
+    def _delete(self, keys):
+        self._conn().executemany("DELETE FROM kv WHERE key = ?", [(key,) for key in keys])
+
+    def _delete_if(self, key: str, value: bytes):
+        return self._conn().execute("DELETE FROM kv WHERE key = ? AND value = ?", (key, value)).rowcount == 1
+
+    def _publish(self, channel: str, message: bytes):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT INTO events (channel, message, created) VALUES (?, ?, ?)", (channel, message, now))
+        conn.execute("DELETE FROM events WHERE created < ?", (now - self.event_retention,))
+
+    def _events_after(self, last_id: int):
+        return self._conn().execute(
+            "SELECT id, channel, message FROM events WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+
+    async def get(self, key: str):
+        return await run_in_threadpool(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        await run_in_threadpool(self._set, key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float = None):
+        return await run_in_threadpool(self._add, key, value, ttl)
+
+    async def incr(self, key: str, amount: int = 1, ttl: float = None):
+        return await run_in_threadpool(self._incr, key, amount, ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await run_in_threadpool(self._delete, keys)
+
+    async def delete_if(self, key: str, value: bytes):
+        return await run_in_threadpool(self._delete_if, key, value)
+
+    async def clear(self):
+        await run_in_threadpool(lambda: self._conn().execute("DELETE FROM kv"))
+
+    async def publish(self, channel: str, message: bytes):
+        await run_in_threadpool(self._publish, channel, message)
+
+    ## polls the events table; only events published after the listener started are delivered
+    async def listen(self, channels, callback):
+        channels = set(channels)
+        last_id = await run_in_threadpool(lambda: self._conn().execute("SELECT coalesce(max(id), 0) FROM events").fetchone()[0])
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for event_id, channel, message in await run_in_threadpool(self._events_after, last_id):
+                last_id = event_id
+                if channel in channels:
+                    callback(channel, message)
+
+    def stats(self):
+        return {"backend": "sqlite", "path": self.path}
+
+
+class RedisBackend(Backend):
+    def __init__(self, url: str, prefix: str = "ecommerce:"):
+        try:
+            import redis.asyncio as redis
+            from redis.exceptions import WatchError
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = WatchError
+
+    async def get(self, key: str):
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        await self._client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def add(self, key: str, value: bytes, ttl: float = None):
+        return bool(await self._client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+
+    ## SET NX PX creates the counter with its TTL in the same MULTI as the INCRBY
+    ## (which keeps the TTL), so a counter never exists without it
+    async def incr(self, key: str, amount: int = 1, ttl: float = None):
+        if not ttl:
+            return await self._client.incrby(self.prefix + key, amount)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(self.prefix + key, 0, px=int(ttl * 1000), nx=True)
+            pipe.incrby(self.prefix + key, amount)
+            _, value = await pipe.execute()
+        return value
+
+    ## WATCH/MULTI rather than a Lua script, so it also works on Redis stand-ins without scripting
+    async def delete_if(self, key: str, value: bytes):
+        async with self._client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self.prefix + key)
+                if await pipe.get(self.prefix + key) != value:
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.delete(self.prefix + key)
+                await pipe.execute()
+                return True
+            except self._watch_error:
+                return False
+
+    async def publish(self, channel: str, message: bytes):
+        await self._client.publish(self.prefix + channel, message)
+
+    async def listen(self, channels, callback):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(*(self.prefix + channel for channel in channels))
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    callback(message["channel"].decode()[len(self.prefix):], message["data"])
+        finally:
+            await pubsub.aclose()
+
+    def stats(self):
+        return {"backend": "redis", "url": self.url}
+
+
+def create_backend(name: str = None, maxsize: int = None):
+    name = name or config.CACHE_BACKEND
+    if name == "memory":
+        return MemoryBackend(maxsize or config.CATALOG_CACHE_SIZE)
+    if name == "sqlite":
+        return SQLiteBackend(config.CACHE_SQLITE_PATH, poll_interval=config.CACHE_EVENT_POLL_INTERVAL)
+    if name == "redis":
+        return RedisBackend(config.CACHE_URL)
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+
+## this process' shared-state backend (catalog cache, counters, locks, events)
+backend = create_backend()
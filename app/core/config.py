@@ -6,14 +6,148 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 
+## access-token verification: "jose" (python-jose), "pyjwt" (PyJWT) or "hmac" (stdlib, HS* only)
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose").lower()
+## verified tokens cached by hash until their exp (0 disables)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+## build the current user from the token claims, without the users table; role changes
+## and deleted users take effect when the access token expires
+AUTH_CLAIMS_FAST_PATH = os.getenv("AUTH_CLAIMS_FAST_PATH", "false").lower() in ("1", "true", "yes")
+
 #Expiry time for both token
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+## bcrypt thread pool: size and queue depth before signin/signup/reset return 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+
+## auth endpoint rate limits: token buckets "capacity/seconds" (a burst of `capacity`,
+## refilled at capacity/seconds per second), per client IP and per submitted email;
+## "" disables a limit. RATE_LIMIT_STORE "memory" is per worker, "shared" uses
+## CACHE_BACKEND so the limits hold across workers (sliding-window counters there).
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))   # buckets kept by the memory store
+RATE_LIMIT_SIGNIN_IP = os.getenv("RATE_LIMIT_SIGNIN_IP", "20/60")
+RATE_LIMIT_SIGNIN_EMAIL = os.getenv("RATE_LIMIT_SIGNIN_EMAIL", "5/60")
+RATE_LIMIT_SIGNUP_IP = os.getenv("RATE_LIMIT_SIGNUP_IP", "5/60")
+RATE_LIMIT_FORGOT_IP = os.getenv("RATE_LIMIT_FORGOT_IP", "5/300")
+RATE_LIMIT_FORGOT_EMAIL = os.getenv("RATE_LIMIT_FORGOT_EMAIL", "3/3600")
+
+## authenticated user cache used by get_current_user (TTL 0 disables it)
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", 60))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+
 ##
 # Email config
 EMAIL_USER = os.getenv("EMAIL_USERNAME")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 EMAIL_FROM = os.getenv("EMAIL_FROM")
-SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
\ No newline at end of file
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 465))
+## "ssl" (implicit TLS), "starttls" or "none" (e.g. a local aiosmtpd stand-in)
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl").lower()
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 10))
+
+# Database
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ecommerce.db")
+## opt-in async mode (AsyncEngine + aiosqlite/asyncpg), off by default
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+## read replicas (comma-separated URLs) for the read-only catalog and order-history
+## endpoints; writes and everything else stay on DATABASE_URL. A user's reads go to
+## the primary for READ_YOUR_WRITES_SECONDS after their checkout, catalog reads after
+## any product or stock change (so replica lag is not cached).
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+## the schema is managed by Alembic (`alembic upgrade head`); for development and
+## scratch databases the app can create the tables and search index at startup instead
+DB_CREATE_SCHEMA = os.getenv("DB_CREATE_SCHEMA", "false").lower() in ("1", "true", "yes")
+
+## connection pool, sized per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))        # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))      # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+## SQLite pragmas applied on every new connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))  # negative = KiB
+
+# Email outbox worker
+EMAIL_WORKER_ENABLED = os.getenv("EMAIL_WORKER_ENABLED", "true").lower() in ("1", "true", "yes")
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 2))       # seconds between outbox polls
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))           # then the row is dead-lettered
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+EMAIL_CLAIM_LEASE_SECONDS = float(os.getenv("EMAIL_CLAIM_LEASE_SECONDS", 600)) # reclaim rows of a crashed worker
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))          # close the idle SMTP connection
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "logs/log_file.log")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()                   # "json" or "text"
+
+# Query profiling: per-request SQL count/time (X-Query-Count, X-Query-Time-Ms headers
+# and the access log) and a slow-query log with the statement's EXPLAIN plan
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))                  # 0 logs every statement
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+
+# Response cache
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()            # "memory", "sqlite" or "redis"
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")          # used by the redis backend
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "shared_state.db")   # used by the sqlite backend
+CACHE_EVENT_POLL_INTERVAL = float(os.getenv("CACHE_EVENT_POLL_INTERVAL", 0.2))  # seconds (sqlite backend)
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 300))          # seconds, 0 disables
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", 10000))        # entries (memory backend)
+CATALOG_VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", 5))        # seconds a worker reuses version tokens, 0 disables
+
+# Server (python -m app.serve). Workers > 1 need a shared CACHE_BACKEND (sqlite or redis)
+# and a file or server database; the launcher switches "memory" to "sqlite".
+HOST = os.getenv("HOST", "127.0.0.1")
+PORT = int(os.getenv("PORT", 8000))
+WORKERS = int(os.getenv("WORKERS", 1))
+
+# Bulk product import/export
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 1000))   # rows per INSERT/upsert + commit
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", 100))    # row errors listed in the report
+BULK_EXPORT_BATCH_SIZE = int(os.getenv("BULK_EXPORT_BATCH_SIZE", 1000))   # rows fetched per cursor round trip
+
+
+## Settings read through `config.NAME` when the app is built or at request time, so a
+## create_app(settings) override takes effect. The others are copied at import (feature
+## flags such as ASYNC_DB, JWT and identity cache options) or size the engines, pools
+## and shared cache backend built then; they can only be set in the environment.
+RUNTIME_SETTINGS = frozenset({
+    "RATE_LIMIT_ENABLED", "RATE_LIMIT_STORE", "RATE_LIMIT_MAX_KEYS",
+    "RATE_LIMIT_SIGNIN_IP", "RATE_LIMIT_SIGNIN_EMAIL", "RATE_LIMIT_SIGNUP_IP",
+    "RATE_LIMIT_FORGOT_IP", "RATE_LIMIT_FORGOT_EMAIL",
+    "EMAIL_USER", "EMAIL_PASSWORD", "EMAIL_FROM",
+    "SMTP_SERVER", "SMTP_PORT", "SMTP_SECURITY", "SMTP_TIMEOUT", "SMTP_IDLE_TIMEOUT",
+    "EMAIL_WORKER_ENABLED", "EMAIL_BATCH_SIZE", "EMAIL_POLL_INTERVAL", "EMAIL_MAX_ATTEMPTS",
+    "EMAIL_RETRY_BASE_SECONDS", "EMAIL_RETRY_MAX_SECONDS", "EMAIL_CLAIM_LEASE_SECONDS",
+    "READ_YOUR_WRITES_SECONDS", "DB_CREATE_SCHEMA",
+    "LOG_LEVEL", "LOG_FILE", "LOG_FORMAT",
+    "QUERY_PROFILING", "SLOW_QUERY_MS", "SLOW_QUERY_EXPLAIN",
+    "CATALOG_CACHE_TTL", "CATALOG_VERSION_TTL",
+    "BULK_IMPORT_BATCH_SIZE", "BULK_IMPORT_MAX_ERRORS", "BULK_EXPORT_BATCH_SIZE",
+})
+
+
+## create_app(settings) overrides, e.g. {"EMAIL_WORKER_ENABLED": False}
+def apply_settings(settings: dict):
+    for name, value in settings.items():
+        if not name.isupper() or name not in globals():
+            raise ValueError(f"Unknown setting: {name}")
+        if name not in RUNTIME_SETTINGS:
+            raise ValueError(f"{name} is read at import and cannot be overridden by create_app; set it in the environment")
+    globals().update(settings)
@@ -1,15 +1,188 @@
 
-from sqlalchemy import create_engine
+import asyncio
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi.concurrency import run_in_threadpool
+from app.core import config
+from app.core.pool_metrics import PoolStats, MeteredQueuePool, MeteredAsyncQueuePool, instrument_pool
+from app.core.query_metrics import instrument_queries, register_pool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ecommerce.db"
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
 
-# Establish a connection to the Sqlite database
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+## pool options from config; in-memory SQLite keeps SQLAlchemy's single-connection pool
+def engine_options(url: str, poolclass):
+    url = make_url(url)
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options
+
+    options.update(
+        poolclass=poolclass,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+## WAL lets readers run alongside the checkout writer; busy_timeout makes a
+## writer wait for the lock instead of failing with "database is locked"
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+
+def configure_engine(sync_engine, stats: PoolStats, name: str):
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+    if hasattr(sync_engine.pool, "stats"):
+        instrument_pool(sync_engine, stats)
+    instrument_queries(sync_engine, name)
+    register_pool(sync_engine, name)
+
+
+# Establish a connection to the database
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, MeteredQueuePool))
+pool_stats = PoolStats()
+configure_engine(engine, pool_stats, "sync")
 
 # Connect to the database and provide a session for interacting with it
-SessionLocal = sessionmaker(autoflush=False, autocommit=False, bind=engine)
+SessionLocal = sessionmaker(autoflush=False, autocommit=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
+
+## Read replicas, used round-robin by get_read_db. Their pools and SQL metrics are
+## labelled replica0, replica1, ...
+replica_engines = []
+replica_pool_stats = []
+ReplicaSessions = []
+
+for index, replica_url in enumerate(config.DATABASE_REPLICA_URLS):
+    replica = create_engine(replica_url, **engine_options(replica_url, MeteredQueuePool))
+    replica_pool_stats.append(PoolStats())
+    configure_engine(replica, replica_pool_stats[-1], f"replica{index}")
+    replica_engines.append(replica)
+    ReplicaSessions.append(sessionmaker(autoflush=False, autocommit=False, expire_on_commit=False, bind=replica))
+
+
+## map a sync driver URL to its async driver (aiosqlite locally, asyncpg for Postgres)
+def to_async_url(url: str):
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:") or url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+## Opt-in async mode: AsyncEngine/AsyncSession on an async driver.
+async_engine = None
+AsyncSessionLocal = None
+async_pool_stats = None
+async_replica_engines = []
+AsyncReplicaSessions = []
+
+if config.ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, MeteredAsyncQueuePool))
+    async_pool_stats = PoolStats()
+    configure_engine(async_engine.sync_engine, async_pool_stats, "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async_replica_engines = []
+    AsyncReplicaSessions = []
+    for index, replica_url in enumerate(config.DATABASE_REPLICA_URLS):
+        replica_url = to_async_url(replica_url)
+        replica = create_async_engine(replica_url, **engine_options(replica_url, MeteredAsyncQueuePool))
+        configure_engine(replica.sync_engine, PoolStats(), f"async_replica{index}")
+        async_replica_engines.append(replica)
+        AsyncReplicaSessions.append(async_sessionmaker(replica, autoflush=False, expire_on_commit=False))
+
+
+## Sync mode holds a pooled connection across awaits, so cap the open sessions at the
+## pool capacity: excess requests wait on the event loop instead of blocking threadpool
+## workers that the sessions already holding a connection need to finish.
+sync_session_slots = asyncio.Semaphore(config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW)
+replica_session_slots = asyncio.Semaphore((config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW) * max(len(replica_engines), 1))
+
+
+## Awaitable facade over a sync Session, so the async route handlers use one
+## API in both modes. Each call runs in the threadpool (sync mode).
+class SyncSessionAdapter:
+    def __init__(self, session):
+        self.sync_session = session
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    ## like AsyncSession.stream: rows are fetched lazily (yield_per / server-side cursor)
+    async def stream(self, statement, params=None, **kwargs):
+        result = await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+        return StreamedResult(result)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+## AsyncResult-like wrapper for SyncSessionAdapter.stream; each partition is fetched in the threadpool
+class StreamedResult:
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size=None):
+        iterator = self.result.partitions(size)
+        while True:
+            partition = await run_in_threadpool(next, iterator, None)
+            if partition is None:
+                break
+            yield partition
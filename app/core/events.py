@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from app.core import cache
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Cross-worker invalidation events over the shared backend's pub/sub.
+## Per-process caches (identity cache, catalog version tokens) subscribe a handler
+## for a channel; a worker that changes the data publishes the key, and every
+## worker, itself included, runs the handlers. Delivery is best effort: the caches
+## also expire by TTL, so a missed event only delays an invalidation.
+
+_handlers = {}
+_loop = None
+
+
+## handler(message: str), called on the event loop; must not block
+def subscribe(channel: str, handler):
+    _handlers.setdefault(channel, []).append(handler)
+
+
+async def publish(channel: str, message: str):
+    try:
+        await cache.backend.publish(channel, message.encode())
+    except Exception as e:
+        logger.error(f"Publishing {channel} event failed: {str(e)}")
+
+
+## for sync code (SQLAlchemy events, threadpool routes); a no-op until the listener runs
+def publish_threadsafe(channel: str, message: str):
+    loop = _loop
+    if loop is None or loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(publish(channel, message))
+    else:
+        asyncio.run_coroutine_threadsafe(publish(channel, message), loop)
+
+
+def dispatch(channel: str, message: bytes):
+    for handler in _handlers.get(channel, ()):
+        try:
+            handler(message.decode())
+        except Exception as e:
+            logger.error(f"{channel} event handler failed: {str(e)}")
+
+
+class EventListener:
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._task = None
+
+    ## reconnects with backoff when the backend drops the subscription
+    async def run(self):
+        delay = 0.5
+        while True:
+            try:
+                await (self.backend or cache.backend).listen(list(_handlers), dispatch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event listener error, reconnecting in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def start(self):
+        global _loop
+        _loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        global _loop
+        _loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,182 @@
+import bisect
+import threading
+
+## Small in-process metric types shared by the app's instrumentation.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+## cumulative-bucket latency histogram (seconds), Prometheus style
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+                running += count
+                cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+            return {"buckets": cumulative, "sum": round(self.sum, 6), "count": self.count}
+
+
+## Labeled metrics for the /metrics endpoint. Writers never take a lock: every
+## thread updates its own shard (a plain dict keyed by the label values) and a
+## scrape sums the shards. Only the first write from a new thread registers
+## its shard under a lock.
+class ShardedMetric:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _snapshot_shards(self):
+        with self._lock:
+            shards = list(self._shards)
+        return [list(shard.items()) for shard in shards]
+
+
+class Counter(ShardedMetric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for items in self._snapshot_shards():
+            for labels, value in items:
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+## per-thread deltas sum to the right value even when inc and dec run on different threads
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class LabeledHistogram(ShardedMetric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    ## entry layout: one count per bucket, +Inf count, sum, count
+    def observe(self, labels: tuple, value: float):
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def collect(self):
+        totals = {}
+        for items in self._snapshot_shards():
+            for labels, entry in items:
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(entry)
+                else:
+                    for index, value in enumerate(entry):
+                        total[index] += value
+        return totals
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values, extra=""):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+## metric registry rendered in the Prometheus text exposition format
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(LabeledHistogram(name, help, labels, buckets))
+
+    ## callable returning [(name, type, help, [(label dict, value), ...]), ...] at scrape time
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            values = metric.collect()
+            if metric.type == "histogram":
+                bounds = [str(bound) for bound in metric.buckets] + ["+Inf"]
+                for labels, entry in sorted(values.items()):
+                    running = 0
+                    for bound, count in zip(bounds, entry):
+                        running += count
+                        le = 'le="' + bound + '"'
+                        lines.append(f"{metric.name}_bucket{format_labels(metric.labels, labels, le)} {running}")
+                    lines.append(f"{metric.name}_sum{format_labels(metric.labels, labels)} {format_value(entry[-2])}")
+                    lines.append(f"{metric.name}_count{format_labels(metric.labels, labels)} {entry[-1]}")
+            else:
+                for labels, value in sorted(values.items()):
+                    lines.append(f"{metric.name}{format_labels(metric.labels, labels)} {format_value(value)}")
+
+        for collector in self.collectors:
+            for name, metric_type, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{format_labels(labels.keys(), labels.values())} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,115 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+## Connection pool metrics: how often connections are checked out, how long
+## requests wait for one and how long they are held, to size pools per worker.
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+        self.checked_out_peak = 0
+        self._checked_out = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self._checked_out += 1
+            self.checked_out_peak = max(self.checked_out_peak, self._checked_out)
+
+    def record_checkin(self, held: float):
+        with self._lock:
+            self._checked_out -= 1
+            self.hold_total += held
+            self.hold_max = max(self.hold_max, held)
+
+    def snapshot(self):
+        with self._lock:
+            checkouts = self.checkouts or 1
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "checked_out_peak": self.checked_out_peak,
+                "wait_avg_ms": round(self.wait_total / checkouts * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "hold_avg_ms": round(self.hold_total / checkouts * 1000, 3),
+                "hold_max_ms": round(self.hold_max * 1000, 3),
+            }
+
+
+## times the wait for a pooled connection (QueuePool blocks inside _do_get)
+class MeteredPoolMixin:
+    stats: PoolStats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+## attach a PoolStats to an engine created with one of the metered pool classes
+def instrument_pool(engine, stats: PoolStats):
+    pool = engine.pool
+    pool.stats = stats
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_time"] = time.perf_counter()
+        stats.record_checkout()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_time", None)
+        if started is not None:
+            stats.record_checkin(time.perf_counter() - started)
+
+
+## current pool state plus the accumulated metrics
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
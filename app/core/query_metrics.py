@@ -0,0 +1,125 @@
+import logging
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from app.core import config
+from app.core.metrics import registry
+from app.core.pool_metrics import pool_status
+
+## SQL statement metrics from engine cursor events, plus connection pool gauges.
+## The HTTP metrics middleware puts a RequestQueryStats in `current_request_stats`;
+## the contextvar follows the request into the threadpool, so statements run on
+## its behalf (sync or async mode) are also counted per request.
+## With QUERY_PROFILING on, statements slower than SLOW_QUERY_MS are logged with
+## their parameters and EXPLAIN plan.
+
+logger = logging.getLogger("ecommerce_logger")
+
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+POOL_COUNTERS = {"checkouts", "timeouts"}
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+EXPLAINABLE = {"SELECT", "UPDATE", "DELETE"}
+MAX_LOGGED_PARAMETERS = 500
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+queries_total = registry.counter(
+    "db_queries_total", "SQL statements executed, by engine and operation.", ("engine", "operation")
+)
+query_duration = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ("engine", "operation"), QUERY_BUCKETS
+)
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+current_request_stats: ContextVar = ContextVar("current_request_stats", default=None)
+
+
+def operation_of(statement: str):
+    words = statement.lstrip().split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+## plan of a statement that just ran, on the same DBAPI connection (raw cursor,
+## so this statement is not seen by the cursor events); None when not available
+def explain(conn, statement, parameters):
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None:
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    ## SQLite: (id, parent, notused, detail); PostgreSQL: one text column per line
+    return [str(row[-1]) for row in rows]
+
+
+def log_slow_query(conn, statement, parameters, executemany, elapsed):
+    operation = operation_of(statement)
+    plan = None
+    if config.SLOW_QUERY_EXPLAIN and not executemany and operation in EXPLAINABLE:
+        try:
+            plan = explain(conn, statement, parameters)
+        except Exception as e:
+            logger.debug(f"EXPLAIN failed for slow query: {str(e)}")
+
+    duration_ms = round(elapsed * 1000, 2)
+    logger.warning(
+        f"Slow query ({duration_ms}ms): {' '.join(statement.split())}",
+        extra={
+            "duration_ms": duration_ms,
+            "statement": statement,
+            "parameters": repr(parameters)[:MAX_LOGGED_PARAMETERS],
+            "plan": plan,
+        },
+    )
+
+
+## count and time every statement run through `sync_engine` (for async engines pass .sync_engine)
+def instrument_queries(sync_engine, name: str):
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        labels = (name, operation_of(statement))
+        queries_total.inc(labels)
+        query_duration.observe(labels, elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+        if config.QUERY_PROFILING and elapsed * 1000 >= config.SLOW_QUERY_MS:
+            log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+    ## a failed statement never reaches after_cursor_execute
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+## expose pool_status() of each engine as gauges at scrape time
+def register_pool(sync_engine, name: str):
+    def collect():
+        samples = []
+        for key, value in pool_status(sync_engine).items():
+            if isinstance(value, (int, float)):
+                kind = "counter" if key in POOL_COUNTERS else "gauge"
+                samples.append((f"db_pool_{key}", kind, f"Connection pool {key.replace('_', ' ')}.", [({"engine": name}, value)]))
+        return samples
+
+    registry.add_collector(collect)
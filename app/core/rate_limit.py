@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from app.core import config
+
+## Rate-limit stores for RateLimitMiddleware. take(key, capacity, period) spends one
+## request of a "capacity per period" limit and returns 0.0 when it is allowed,
+## otherwise the seconds until it would be.
+
+
+## "20/60" -> (20, 60.0); "" or "0/..." -> None (no limit)
+def parse_limit(spec: str):
+    if not spec:
+        return None
+    capacity, _, period = spec.partition("/")
+    capacity, period = int(capacity), float(period or 1)
+    if capacity <= 0 or period <= 0:
+        return None
+    return capacity, period
+
+
+## Token buckets in this process: a burst of `capacity`, refilled continuously at
+## capacity/period per second. O(1) per request (lazy refill, LRU-bounded dict);
+## an evicted bucket starts again full. Only touched from the event loop.
+class MemoryRateLimitStore:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, capacity: int, period: float):
+        now = time.monotonic()
+        rate = capacity / period
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (1 - tokens) / rate
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self):
+        return {"store": "memory", "buckets": len(self._buckets), "maxsize": self.maxsize}
+
+
+## Limits shared by all workers through the cache backend (app.core.cache). The
+## backends offer atomic counters but no scripting, so this is the sliding-window
+## counter approximation of the same limit: attempts in the current fixed window
+## plus the previous window's count weighted by its remaining overlap.
+class SharedRateLimitStore:
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def take(self, key: str, capacity: int, period: float):
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        count = await self.backend.incr(f"ratelimit:{key}:{window}", 1, ttl=period * 2)
+        previous = int(await self.backend.get(f"ratelimit:{key}:{window - 1}") or 0)
+        if previous * (1 - elapsed / period) + count <= capacity:
+            return 0.0
+        if count > capacity or not previous:
+            return period - elapsed
+        return max(period * (1 - (capacity - count) / previous) - elapsed, 0.001)
+
+    def stats(self):
+        return {"store": "shared", **self.backend.stats()}
+
+
+def create_store(name: str = None):
+    name = name or config.RATE_LIMIT_STORE
+    if name == "memory":
+        return MemoryRateLimitStore(config.RATE_LIMIT_MAX_KEYS)
+    if name == "shared":
+        from app.core.cache import backend
+        return SharedRateLimitStore(backend)
+    raise ValueError(f"Unknown RATE_LIMIT_STORE: {name}")
@@ -0,0 +1,49 @@
+import logging
+import time
+from app.core import config, events
+from app.core.cache import backend
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Read-your-writes for replica reads (see get_read_db). After a user's checkout their
+## reads stay on the primary for READ_YOUR_WRITES_SECONDS; the marker lives in the
+## shared backend so it holds on every worker. Other users keep reading the replicas.
+## After a product or stock change the catalog cache does not store responses read
+## from a replica for the same window, since it may not have caught up; that marker
+## is per worker and spread by the "catalog" event.
+
+_catalog_written_until = 0.0
+
+
+def written_key(subject: str):
+    return f"ryw:{subject}"
+
+
+async def mark_written(subject: str):
+    if not config.DATABASE_REPLICA_URLS or config.READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    try:
+        await backend.set(written_key(subject), b"1", ttl=config.READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        logger.error(f"Read-your-writes marker failed for {subject}: {str(e)}")
+
+
+## True while `subject` must read from the primary; also when the backend is unreachable
+async def recently_wrote(subject: str):
+    try:
+        return await backend.get(written_key(subject)) is not None
+    except Exception as e:
+        logger.warning(f"Read-your-writes check failed, reading from the primary: {str(e)}")
+        return True
+
+
+def catalog_written(message: str = None):
+    global _catalog_written_until
+    _catalog_written_until = time.monotonic() + config.READ_YOUR_WRITES_SECONDS
+
+
+def catalog_recently_written():
+    return time.monotonic() < _catalog_written_until
+
+
+events.subscribe("catalog", catalog_written)
@@ -0,0 +1,19 @@
+from app.core.database import Base, engine
+from app.auth import models as auth_models
+from app.products import models as product_models
+from app.cart import models as cart_models
+from app.orders import models as order_models
+from app.emails import models as email_models
+from app.products.search import create_search_index
+from app.products.availability import create_availability_sync
+
+## Development/scratch-database shortcut for `alembic upgrade head`: the tables from
+## the models plus the full-text search index and the availability triggers. Used at
+## startup when DB_CREATE_SCHEMA is set, and by the seed and benchmark scripts.
+
+
+def create_schema(bind=engine):
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        create_search_index(conn)
+        create_availability_sync(conn)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, or_, and_
+from app.core import config
+from app.core.database import SessionLocal
+from app.emails.models import EmailOutbox, EmailStatus, utcnow
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Email outbox: requests only insert a row (same transaction as their own writes);
+## OutboxWorker drains it in the background over one persistent SMTP connection,
+## in batches, retrying with exponential backoff and dead-lettering after
+## EMAIL_MAX_ATTEMPTS.
+
+_wakeup = None
+
+
+## add a message to the outbox; it is sent once the caller commits
+def enqueue(db, to_email: str, subject: str, body: str):
+    db.add(EmailOutbox(to_email=to_email, subject=subject, body=body))
+
+
+## wake the worker after a commit instead of waiting for the next poll
+def notify():
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+## smtplib/email (and ssl) are imported by the worker when it first sends, not at import
+def build_message(row: EmailOutbox):
+    from email.message import EmailMessage
+    msg = EmailMessage()
+    msg["Subject"] = row.subject
+    msg["From"] = config.EMAIL_FROM or config.EMAIL_USER
+    msg["To"] = row.to_email
+    msg.set_content(row.body)
+    return msg
+
+
+def backoff(attempts: int):
+    return min(config.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), config.EMAIL_RETRY_MAX_SECONDS)
+
+
+## persistent SMTP connection, reopened when the server drops it or it sat idle
+class SMTPConnection:
+    def __init__(self):
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        import smtplib
+        if config.SMTP_SECURITY == "ssl":
+            smtp = smtplib.SMTP_SSL(config.SMTP_SERVER, config.SMTP_PORT, timeout=config.SMTP_TIMEOUT)
+        else:
+            smtp = smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT, timeout=config.SMTP_TIMEOUT)
+            if config.SMTP_SECURITY == "starttls":
+                smtp.starttls()
+        if config.EMAIL_USER:
+            smtp.login(config.EMAIL_USER, config.EMAIL_PASSWORD)
+        return smtp
+
+    def send(self, message):
+        import smtplib
+        if self._smtp is None or self.idle():
+            self.close()
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    def idle(self):
+        return time.monotonic() - self._last_used > config.SMTP_IDLE_TIMEOUT
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+
+class OutboxWorker:
+    def __init__(self, session_factory=SessionLocal, smtp: SMTPConnection = None):
+        self.session_factory = session_factory
+        self.smtp = smtp or SMTPConnection()
+        self._task = None
+        self._stopping = False
+
+    ## due pending rows, plus rows stuck in "sending" by a worker that died
+    def _claimable(self, now):
+        lease_expired = now - timedelta(seconds=config.EMAIL_CLAIM_LEASE_SECONDS)
+        return or_(
+            and_(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == EmailStatus.SENDING, EmailOutbox.claimed_at < lease_expired),
+        )
+
+    ## mark a batch as ours; the conditional UPDATE keeps concurrent workers from double-sending
+    def claim_batch(self, db):
+        now = utcnow()
+        token = uuid.uuid4().hex
+        ids = db.scalars(
+            select(EmailOutbox.id)
+            .where(self._claimable(now))
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(config.EMAIL_BATCH_SIZE)
+        ).all()
+        if not ids:
+            return []
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids), self._claimable(now))
+            .values(status=EmailStatus.SENDING, claim_token=token, claimed_at=now)
+        )
+        db.commit()
+        return db.scalars(select(EmailOutbox).where(EmailOutbox.claim_token == token)).all()
+
+    ## send one batch; returns how many rows were processed
+    def drain_once(self):
+        with self.session_factory() as db:
+            rows = self.claim_batch(db)
+            for row in rows:
+                row.attempts += 1
+                row.claim_token = None
+                try:
+                    self.smtp.send(build_message(row))
+                    row.status = EmailStatus.SENT
+                    row.sent_at = utcnow()
+                    row.last_error = None
+                    logger.info(f"Email {row.id} sent to {row.to_email}")
+                except Exception as e:
+                    import smtplib
+                    self.smtp.close()
+                    row.last_error = str(e)[:500]
+                    permanent = isinstance(e, smtplib.SMTPRecipientsRefused)
+                    if permanent or row.attempts >= config.EMAIL_MAX_ATTEMPTS:
+                        row.status = EmailStatus.DEAD
+                        logger.error(f"Email {row.id} to {row.to_email} dead-lettered: {e}")
+                    else:
+                        row.status = EmailStatus.PENDING
+                        row.next_attempt_at = utcnow() + timedelta(seconds=backoff(row.attempts))
+                        logger.warning(f"Email {row.id} to {row.to_email} failed, retrying: {e}")
+            db.commit()
+            return len(rows)
+
+    async def run(self):
+        while not self._stopping:
+            try:
+                processed = await run_in_threadpool(self.drain_once)
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {str(e)}")
+                processed = 0
+
+            if processed >= config.EMAIL_BATCH_SIZE:
+                continue  # more rows are probably due
+            if self.smtp.idle():
+                await run_in_threadpool(self.smtp.close)
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=config.EMAIL_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+
+    def start(self):
+        global _wakeup
+        _wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._stopping = True
+        notify()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await run_in_threadpool(self.smtp.close)
@@ -1,5 +1,14 @@
-from fastapi import FastAPI,Request
-from app.core.database import Base, engine
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from app.core import config
+from app.core.database import engine, async_engine, replica_engines, async_replica_engines
+from app.core.events import EventListener
+from app.core.pool_metrics import pool_status
+from app.auth import hashing
+from app.auth.token_cache import token_cache
+from app.products import cache as catalog_cache
+from app.emails.outbox import OutboxWorker
 from app.auth.routes import router as auth_router
 from app.products.routes import router as products_router
 from app.products.public_products_routes import router as public_products_router
@@ -10,54 +19,98 @@ from app.checkout.routes import router as checkout_router
 ##exception handling
 import logging
 from fastapi.responses import JSONResponse
+from app.utils.serialization import DefaultJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 ##logging middleware
 import traceback
 from app.middlewares.logging_middleware import LoggingMiddleware
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler("logs/log_file.log"),  
-        logging.StreamHandler()
-    ]
-)
+from app.middlewares.metrics_middleware import MetricsMiddleware
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.core.metrics import registry
+from fastapi.responses import PlainTextResponse
+from app.core.logging_config import setup_logging
+
+## The app is built by create_app(). Importing this module does no database work:
+## the schema comes from `alembic upgrade head` (or DB_CREATE_SCHEMA at startup),
+## and bcrypt/jose/SMTP are imported on first use, which keeps worker boot short.
+## `uvicorn app.main:app` serves the default app; `uvicorn --factory app.main:create_app` builds one per worker.
+## `python -m app.serve` runs WORKERS workers with shared cache/rate-limit state (see app/serve.py).
+
+
+## schema (opt-in), cross-worker invalidation events, background email outbox worker;
+## release pooled async connections (aiosqlite keeps a thread per connection)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.DB_CREATE_SCHEMA:
+        from app.core.schema import create_schema
+        await run_in_threadpool(create_schema)
+
+    event_listener = EventListener()
+    event_listener.start()
+    email_worker = OutboxWorker() if config.EMAIL_WORKER_ENABLED else None
+    if email_worker is not None:
+        email_worker.start()
+    yield
+    if email_worker is not None:
+        await email_worker.stop()
+    await event_listener.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+
+
+health_router = APIRouter()
+
+
+@health_router.get("/")
+async def root():
+    return {"message": " E-commerce Backend System "}
 
 
-Base.metadata.create_all(bind=engine)
+## connection pool state and checkout/wait metrics, to size pools per worker
+@health_router.get("/health/db")
+async def db_health():
+    status = {"sync": pool_status(engine)}
+    if async_engine is not None:
+        status["async"] = pool_status(async_engine.sync_engine)
+    for index, replica in enumerate(replica_engines):
+        status[f"replica{index}"] = pool_status(replica)
+    for index, replica in enumerate(async_replica_engines):
+        status[f"async_replica{index}"] = pool_status(replica.sync_engine)
+    return status
 
-app = FastAPI(title="E-Commerce Backend System Using FastAPI")
 
-app.add_middleware(LoggingMiddleware)
+## bcrypt pool queue depth, rejections and per-operation latency histograms; verified-token cache
+@health_router.get("/health/auth")
+async def auth_health():
+    return {**hashing.stats(), "token_cache": token_cache.stats()}
 
-app.include_router(auth_router)
-app.include_router(products_router)
-app.include_router(public_products_router)
-app.include_router(orders_router)
-app.include_router(cart_router)
-app.include_router(checkout_router)
 
+## Prometheus text exposition: HTTP, SQL and pool metrics
+@health_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
-@app.get("/")
-def root():
-    return {"message": " E-commerce Backend System "}
+## catalog response cache hit/miss counters and backend
+@health_router.get("/health/cache")
+async def cache_health():
+    return catalog_cache.stats()
 
 
 ##exceptional handling
-@app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     logging.warning(f" HTTPException at {request.url.path} | Status: {exc.status_code} | Detail: {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": True, "message": exc.detail, "code": exc.status_code},
+        headers=exc.headers,
     )
 
 
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logging.warning(f" Validation error at {request.url.path} | Errors: {exc.errors()}")
     return JSONResponse(
@@ -66,10 +119,38 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-@app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logging.error(f" Unhandled Exception at {request.url.path}: {repr(exc)}\n{traceback.format_exc()}")
     return JSONResponse(
         status_code=500,
         content={"error": True, "message": "Internal Server Error", "code": 500},
-    )
\ No newline at end of file
+    )
+
+
+## settings: config overrides, see config.apply_settings
+def create_app(settings: dict = None) -> FastAPI:
+    if settings:
+        config.apply_settings(settings)
+    setup_logging()
+
+    app = FastAPI(title="E-Commerce Backend System Using FastAPI", lifespan=lifespan, default_response_class=DefaultJSONResponse)
+
+    app.add_middleware(RateLimitMiddleware)  ## innermost of the three, so 429s are logged and counted
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    app.include_router(auth_router)
+    app.include_router(products_router)
+    app.include_router(public_products_router)
+    app.include_router(orders_router)
+    app.include_router(cart_router)
+    app.include_router(checkout_router)
+    app.include_router(health_router)
+
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(Exception, global_exception_handler)
+    return app
+
+
+app = create_app()
@@ -1,12 +1,51 @@
-
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
+from app.core import config
+from app.core.query_metrics import current_request_stats
 
 logger = logging.getLogger("ecommerce_logger")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"{request.client.host} - {request.method} {request.url.path}")
-        response = await call_next(request)
-        return response
\ No newline at end of file
+## Pure ASGI access log (no BaseHTTPMiddleware task/stream per request, streaming
+## responses pass straight through). Logs once the response is sent, keyed by the
+## route template (/orders/{order_id}) rather than the raw path.
+## With QUERY_PROFILING on, the entry also carries the request's SQL count and time.
+class LoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or scope["path"]
+            client = scope.get("client")
+            host = client[0] if client else "-"
+            message = f"{host} - {scope['method']} {path} {status} {duration_ms}ms"
+            extra = {
+                "client": host,
+                "method": scope["method"],
+                "path": path,
+                "status": status,
+                "duration_ms": duration_ms,
+            }
+            stats = current_request_stats.get()
+            if config.QUERY_PROFILING and stats is not None:
+                extra["db_queries"] = stats.count
+                extra["db_ms"] = round(stats.seconds * 1000, 2)
+                message += f" ({stats.count} queries, {extra['db_ms']}ms)"
+            logger.info(message, extra=extra)
@@ -0,0 +1,70 @@
+import time
+from starlette.datastructures import MutableHeaders
+from app.core import config
+from app.core.metrics import registry
+from app.core.query_metrics import RequestQueryStats, current_request_stats
+
+## Pure ASGI request metrics keyed by route template (/orders/{order_id}), so the
+## label set stays bounded; unmatched paths share the "unmatched" route label.
+## With QUERY_PROFILING on, the response also reports the SQL statements run so far
+## (X-Query-Count, X-Query-Time-Ms); statements run while a streaming body is
+## produced are not included.
+
+DB_QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status.", ("method", "route", "status")
+)
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",)
+)
+request_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements per request.", ("method", "route"), DB_QUERY_BUCKETS
+)
+request_query_seconds = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("method", "route")
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        stats = RequestQueryStats()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if config.QUERY_PROFILING:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Query-Count"] = str(stats.count)
+                    headers["X-Query-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+            await send(message)
+
+        token = current_request_stats.set(stats)
+        requests_in_flight.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec((method,))
+            current_request_stats.reset(token)
+
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            requests_total.inc((method, route, str(status)))
+            request_duration.observe((method, route), elapsed)
+            request_queries.observe((method, route), stats.count)
+            request_query_seconds.observe((method, route), stats.seconds)
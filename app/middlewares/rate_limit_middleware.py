@@ -0,0 +1,124 @@
+import json
+import logging
+import math
+from dataclasses import dataclass
+from fastapi.responses import JSONResponse
+from app.core import config
+from app.core.metrics import registry
+from app.core.rate_limit import create_store, parse_limit
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Pure ASGI rate limiting for the auth endpoints that hash passwords or send email.
+## Runs before routing, so a rejected request costs a bucket lookup and a 429 with
+## Retry-After: no body validation, database session or bcrypt work. The per-IP
+## limit is checked first; the per-email limit then reads the (small) JSON body and
+## replays it to the app. The client IP is the ASGI client address; behind a proxy
+## run uvicorn with --proxy-headers so it is the X-Forwarded-For address.
+
+MAX_BODY_BYTES = 16 * 1024  # larger bodies are passed on without an email key
+
+rejections_total = registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by the auth rate limiter.", ("route", "key")
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RoutePolicy:
+    name: str
+    per_ip: tuple = None     # (capacity, period)
+    per_email: tuple = None
+
+
+def default_policies():
+    return {
+        "/auth/signin": RoutePolicy("signin", parse_limit(config.RATE_LIMIT_SIGNIN_IP), parse_limit(config.RATE_LIMIT_SIGNIN_EMAIL)),
+        "/auth/signup": RoutePolicy("signup", parse_limit(config.RATE_LIMIT_SIGNUP_IP)),
+        "/auth/forgot-password": RoutePolicy("forgot_password", parse_limit(config.RATE_LIMIT_FORGOT_IP), parse_limit(config.RATE_LIMIT_FORGOT_EMAIL)),
+    }
+
+
+## buffered request body messages, then the live channel (http.disconnect)
+def replay(messages, receive):
+    async def replay_receive():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+    return replay_receive
+
+
+async def read_body(receive):
+    messages, size = [], 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            return messages, None
+        size += len(message.get("body", b""))
+        if not message.get("more_body", False) or size > MAX_BODY_BYTES:
+            break
+    if size > MAX_BODY_BYTES:
+        return messages, None
+    return messages, b"".join(message.get("body", b"") for message in messages)
+
+
+def email_of(body: bytes):
+    try:
+        email = json.loads(body).get("email")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return email.strip().lower()[:320]
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, store=None, policies=None):
+        self.app = app
+        self.store = store or create_store()
+        self.policies = default_policies() if policies is None else policies
+
+    async def __call__(self, scope, receive, send):
+        policy = None
+        if scope["type"] == "http" and scope["method"] == "POST" and config.RATE_LIMIT_ENABLED:
+            policy = self.policies.get(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        if policy.per_ip is not None:
+            client = scope.get("client")
+            ip = client[0] if client else "unknown"
+            wait = await self.take(f"{policy.name}:ip:{ip}", policy.per_ip)
+            if wait:
+                await self.reject(scope, receive, send, policy, "ip", wait)
+                return
+
+        if policy.per_email is not None:
+            messages, body = await read_body(receive)
+            receive = replay(messages, receive)
+            email = email_of(body) if body else None
+            if email is not None:
+                wait = await self.take(f"{policy.name}:email:{email}", policy.per_email)
+                if wait:
+                    await self.reject(scope, receive, send, policy, "email", wait)
+                    return
+
+        await self.app(scope, receive, send)
+
+    ## a store failure (shared backend down) lets the request through
+    async def take(self, key: str, limit: tuple):
+        try:
+            return await self.store.take(key, *limit)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {str(e)}")
+            return 0.0
+
+    async def reject(self, scope, receive, send, policy: RoutePolicy, key: str, wait: float):
+        rejections_total.inc((policy.name, key))  ## the access log already records each 429
+        response = JSONResponse(
+            status_code=429,
+            content={"error": True, "message": "Too many requests, please retry later", "code": 429},
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+        await response(scope, receive, send)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Enum as SqlEnum 
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index, Enum as SqlEnum 
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
@@ -22,10 +22,15 @@ class Order(Base):
     items = relationship("OrderItem", back_populates="order")
     user = relationship("User", back_populates="orders")
 
+    ## order history: a user's orders newest first
+    __table_args__ = (
+        Index("ix_orders_user_id", "user_id", "id"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"))
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="SET NULL"), nullable=True)
     product_name = Column(String)
     quantity = Column(Integer)
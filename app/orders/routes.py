@@ -1,32 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.utils.dependency import require_user, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.utils.dependency import require_user, get_db, get_read_db
+from app.utils.pagination import fetch_keyset_page
+from app.utils.serialization import json_response, rows_to_dicts, schema_columns
 from app.orders import models, schemas
+from datetime import datetime
+from typing import Optional, Union
 import logging
 
 logger = logging.getLogger("ecommerce_logger")
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
-#Endpoint for fetching order history
-@router.get("/", response_model=list[schemas.OrderOut])
-def order_history(db: Session = Depends(get_db), user=Depends(require_user)):
+## newest first; order ids grow with created_at, so the keyset is the id alone
+## (served by ix_orders_user_id) and created_at is only used for the date range
+HISTORY_KEY = (models.Order.id,)
+
+CURSOR_HELP = "Cursor mode: pass an empty cursor for the first page, then next_cursor"
+
+## order history is served as plain rows shaped like OrderOut (see app.utils.serialization)
+ORDER_COLUMNS = schema_columns(models.Order, schemas.OrderOut, exclude=("items",))
+ITEM_COLUMNS = schema_columns(models.OrderItem, schemas.OrderItemOut)
+
+
+def history_filters(query, user_id: int, created_from: Optional[datetime], created_to: Optional[datetime]):
+    query = query.where(models.Order.user_id == user_id)
+    if created_from is not None:
+        query = query.where(models.Order.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(models.Order.created_at <= created_to)
+    return query
+
+
+## order rows -> dicts with their line items, loaded for the whole page in one query
+async def attach_items(db, rows):
+    orders = rows_to_dicts(rows)
+    by_id = {}
+    for order in orders:
+        order["items"] = []
+        by_id[order["id"]] = order
+
+    if by_id:
+        result = await db.execute(
+            select(models.OrderItem.order_id, *ITEM_COLUMNS)
+            .where(models.OrderItem.order_id.in_(list(by_id)))
+            .order_by(models.OrderItem.id)
+        )
+        for row in result.all():
+            item = row._asdict()
+            by_id[item.pop("order_id")]["items"].append(item)
+    return orders
+
+
+#Endpoint for fetching order history. Without a cursor it returns the user's whole (filtered)
+#history, newest first; cursor mode returns pages of `limit` orders.
+@router.get("/", response_model=Union[list[schemas.OrderOut], schemas.OrderPage])
+async def order_history(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100, description="Page size in cursor mode"),
+    cursor: Optional[str] = Query(None, description=CURSOR_HELP),
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(require_user)
+):
 
     try:
-        orders = db.query(models.Order).filter_by(user_id=user.id).all()
+        query = history_filters(select(*ORDER_COLUMNS), user.id, created_from, created_to)
+        if cursor is not None:
+            rows, next_cursor = await fetch_keyset_page(
+                db, query, "id", HISTORY_KEY, cursor, limit, descending=True, scalars=False
+            )
+            orders = await attach_items(db, rows)
+            logger.info(f"Fetched order history page for user {user.id}")
+            return json_response({"items": orders, "next_cursor": next_cursor})
+
+        result = await db.execute(query.order_by(*(column.desc() for column in HISTORY_KEY)))
+        orders = await attach_items(db, result.all())
         logger.info(f"Fetched order history for user {user.id}")
-        return orders
+        return json_response(orders)
+
+    except HTTPException as http_exc:
+         raise http_exc
     
     except Exception as e:
 
         logger.error(f"Error : fetching order history for user: {str(e)}")
         raise HTTPException(status_code=500, detail="Something went wrong while fetching order history")
 
+#Endpoint for order list views: one row per order with its line-item count, without the items
+@router.get("/summary", response_model=schemas.OrderSummaryPage)
+async def order_summary(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(require_user)
+):
+    try:
+        item_count = (
+            select(func.count(models.OrderItem.id))
+            .where(models.OrderItem.order_id == models.Order.id)
+            .correlate(models.Order)
+            .scalar_subquery()
+        )
+        query = select(
+            models.Order.id,
+            models.Order.total_amount,
+            models.Order.status,
+            models.Order.created_at,
+            item_count.label("item_count"),
+        )
+        query = history_filters(query, user.id, created_from, created_to)
+        rows, next_cursor = await fetch_keyset_page(
+            db, query, "id", HISTORY_KEY, cursor or "", limit, descending=True, scalars=False
+        )
+        logger.info(f"Fetched order summary for user {user.id}")
+        return {"items": rows, "next_cursor": next_cursor}
+
+    except HTTPException as http_exc:
+         raise http_exc
+
+    except Exception as e:
+        logger.error(f"Error : fetching order summary for user: {str(e)}")
+        raise HTTPException(status_code=500, detail="Something went wrong while fetching order summary")
+
 #Endpoint for fetching order information
 @router.get("/{order_id}", response_model=schemas.OrderOut)
-def order_detail(order_id: int, db: Session = Depends(get_db), user=Depends(require_user)):
+async def order_detail(order_id: int, db: AsyncSession = Depends(get_db), user=Depends(require_user)):
     try:
-        order = db.query(models.Order).filter_by(id=order_id, user_id=user.id).first()
+        result = await db.execute(
+            select(models.Order).filter_by(id=order_id, user_id=user.id).options(selectinload(models.Order.items))
+        )
+        order = result.scalars().first()
 
         if not order:
             logger.warning(f"Order not found (User: {user.id}, Order ID: {order_id})")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 
 class OrderItemOut(BaseModel):
@@ -21,4 +22,25 @@ class OrderOut(BaseModel):
 
     model_config = {
         "from_attributes": True
-    }
\ No newline at end of file
+    }
+
+## page returned in cursor mode
+class OrderPage(BaseModel):
+    items: list[OrderOut]
+    next_cursor: Optional[str] = None
+
+## slim row for order list views
+class OrderSummaryOut(BaseModel):
+    id: int
+    total_amount: float
+    status: str
+    created_at: datetime
+    item_count: int  # number of line items, not units
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class OrderSummaryPage(BaseModel):
+    items: list[OrderSummaryOut]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,138 @@
+from sqlalchemy import text
+
+## Availability projection (product_availability): available quantity, in-stock flag
+## and low-stock bucket per product. Triggers on products keep it in step with
+## every stock write (checkout's conditional UPDATE, admin edits, bulk upserts,
+## seeding): an insert adds the row, a stock change applies the difference
+## incrementally, a price change is copied, a delete removes it. `reserved` is for
+## open reservations; nothing reserves stock yet (orders are paid at checkout), so
+## it stays 0.
+
+TABLE = "product_availability"
+LOW_STOCK_THRESHOLD = 5  # available quantity at or below which a product is "low_stock"
+
+
+def level_sql(available: str):
+    return (
+        f"CASE WHEN {available} <= 0 THEN 'out_of_stock' "
+        f"WHEN {available} <= {LOW_STOCK_THRESHOLD} THEN 'low_stock' ELSE 'in_stock' END"
+    )
+
+
+## price is copied from products so in_stock listings can be sorted by price on the
+## projection's own index; price=False builds the projection's first version (no
+## price column), which its migration creates
+def insert_sql(row: str, price: bool = True):
+    columns = "product_id, available, reserved, in_stock, stock_level" + (", price" if price else "")
+    values = f"{row}.id, {row}.stock, 0, {row}.stock > 0, {level_sql(f'{row}.stock')}" + (f", {row}.price" if price else "")
+    return f"INSERT INTO {TABLE} ({columns}) VALUES ({values})"
+
+
+## SET expressions read the pre-update row, so `available` is the old value throughout
+def update_sql(new: str, old: str, price: bool = True):
+    available = f"available + {new}.stock - {old}.stock"
+    return (
+        f"UPDATE {TABLE} SET available = {available}, in_stock = {available} > 0, "
+        f"stock_level = {level_sql(available)}" + (f", price = {new}.price" if price else "") +
+        f" WHERE product_id = {new}.id"
+    )
+
+
+def sqlite_sync_ddl(price: bool = True):
+    columns, changed = ("stock, price", "new.stock IS NOT old.stock OR new.price IS NOT old.price") if price \
+        else ("stock", "new.stock IS NOT old.stock")
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS product_availability_ai AFTER INSERT ON products BEGIN
+            {insert_sql('new', price)};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS product_availability_au AFTER UPDATE OF {columns} ON products
+        WHEN {changed} BEGIN
+            {update_sql('new', 'old', price)};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS product_availability_ad AFTER DELETE ON products BEGIN
+            DELETE FROM {TABLE} WHERE product_id = old.id;
+        END
+        """,
+    ]
+
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS product_availability_ad",
+    "DROP TRIGGER IF EXISTS product_availability_au",
+    "DROP TRIGGER IF EXISTS product_availability_ai",
+]
+
+
+## deletes cascade through the foreign key on PostgreSQL
+def pg_sync_ddl(price: bool = True):
+    columns, changed = ("stock, price", "NEW.stock IS DISTINCT FROM OLD.stock OR NEW.price IS DISTINCT FROM OLD.price") if price \
+        else ("stock", "NEW.stock IS DISTINCT FROM OLD.stock")
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION product_availability_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {insert_sql('NEW', price)};
+            ELSIF {changed} THEN
+                {update_sql('NEW', 'OLD', price)};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS product_availability_sync ON products",
+        f"""
+        CREATE TRIGGER product_availability_sync AFTER INSERT OR UPDATE OF {columns} ON products
+        FOR EACH ROW EXECUTE FUNCTION product_availability_sync()
+        """,
+    ]
+
+
+PG_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS product_availability_sync ON products",
+    "DROP FUNCTION IF EXISTS product_availability_sync()",
+]
+
+
+## rows for products that existed before the triggers
+def backfill_sql(price: bool = True):
+    columns = "product_id, available, reserved, in_stock, stock_level" + (", price" if price else "")
+    values = f"products.id, products.stock, 0, products.stock > 0, {level_sql('products.stock')}" + (", products.price" if price else "")
+    return f"""
+        INSERT INTO {TABLE} ({columns})
+        SELECT {values}
+        FROM products LEFT JOIN {TABLE} ON {TABLE}.product_id = products.id
+        WHERE {TABLE}.product_id IS NULL
+    """
+
+
+## the price column's backfill when it is added to an existing projection
+BACKFILL_PRICE = f"UPDATE {TABLE} SET price = (SELECT price FROM products WHERE products.id = {TABLE}.product_id)"
+
+
+def create_availability_sync(conn, price: bool = True):
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        ddl = sqlite_sync_ddl(price)
+    elif dialect == "postgresql":
+        ddl = pg_sync_ddl(price)
+    else:
+        return
+    for statement in ddl:
+        conn.execute(text(statement))
+    conn.execute(text(backfill_sql(price)))
+
+
+def drop_availability_sync(conn):
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DROP_DDL:
+            conn.execute(text(statement))
+    elif dialect == "postgresql":
+        for statement in PG_DROP_DDL:
+            conn.execute(text(statement))
@@ -0,0 +1,234 @@
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+from pydantic import ValidationError
+from sqlalchemy import select, insert, text
+from app.core import config
+from app.products.models import Product, normalize_category
+from app.products.schemas import ProductCreate
+from app.products import cache as catalog_cache
+from app.utils.dependency import open_db
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Bulk catalog import/export.
+## Import reads the upload as a stream, validates every row with ProductCreate and
+## writes BULK_IMPORT_BATCH_SIZE rows per statement + commit: rows without an id are
+## plain multi-row INSERTs, rows with an id are upserted (INSERT ... ON CONFLICT (id)
+## DO UPDATE), so re-importing an export updates the catalog in place.
+## Export streams the table through a server-side cursor, so memory does not grow
+## with the catalog size.
+
+EXPORT_COLUMNS = ("id", "name", "description", "price", "stock", "category", "image_url")
+UPSERT_COLUMNS = ("name", "description", "price", "stock", "category", "category_key", "image_url")
+
+
+## decoded lines of a byte stream (keeps the line ending, strips a UTF-8 BOM)
+async def iter_lines(chunks):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+## (row number, dict, error) per CSV record; the first record is the header.
+## A record continues over the next line while it has an unbalanced quote.
+async def iter_csv_rows(chunks):
+    header = None
+    record = ""
+    number = 0
+    async for line in iter_lines(chunks):
+        record += line
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        number += 1
+        if len(values) != len(header):
+            yield number, None, [f"expected {len(header)} columns, got {len(values)}"]
+        else:
+            yield number, dict(zip(header, values)), None
+    if record.strip():
+        yield number + 1, None, ["unterminated quoted field"]
+
+
+async def iter_ndjson_rows(chunks):
+    number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, [f"invalid JSON: {e}"]
+            continue
+        if not isinstance(row, dict):
+            yield number, None, ["expected a JSON object"]
+        else:
+            yield number, row, None
+
+
+## -> (product id or None, column values, errors)
+def validate_row(row: dict):
+    product_id = row.pop("id", None)
+    if product_id in (None, ""):
+        product_id = None
+    else:
+        try:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
+            return None, None, ["id: must be an integer"]
+        if product_id < 1:
+            return None, None, ["id: must be >= 1"]
+
+    try:
+        product = ProductCreate.model_validate(row)
+    except ValidationError as e:
+        return None, None, [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+
+    values = product.model_dump()
+    values["category_key"] = normalize_category(values["category"])
+    return product_id, values, None
+
+
+def upsert_statement(dialect: str):
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    statement = dialect_insert(Product)
+    return statement.on_conflict_do_update(
+        index_elements=[Product.id],
+        set_={column: statement.excluded[column] for column in UPSERT_COLUMNS},
+    )
+
+
+## fallback for dialects without ON CONFLICT support
+def merge_rows(session, rows):
+    for row in rows:
+        session.merge(Product(**row))
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.upserted = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def add_error(self, number: int, errors: list):
+        self.failed += 1
+        if len(self.errors) < config.BULK_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": number, "errors": errors})
+
+    def as_dict(self):
+        seconds = time.perf_counter() - self.started
+        imported = self.created + self.upserted
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(imported / seconds, 1) if seconds > 0 else 0.0,
+        }
+
+
+## write one chunk in its own transaction; a database error fails only this chunk
+async def write_batch(db, batch, report: ImportReport):
+    new_rows = [values for _, product_id, values in batch if product_id is None]
+    upserts = [{"id": product_id, **values} for _, product_id, values in batch if product_id is not None]
+
+    try:
+        if new_rows:
+            await db.execute(insert(Product), new_rows)
+        if upserts:
+            statement = upsert_statement(db.get_bind().dialect.name)
+            if statement is None:
+                await db.run_sync(merge_rows, upserts)
+            else:
+                await db.execute(statement, upserts)
+        await db.commit()
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Bulk import chunk starting at row {batch[0][0]} failed: {str(e)}")
+        for number, _, _ in batch:
+            report.add_error(number, [f"database error: {str(e).splitlines()[0]}"])
+        return
+
+    report.created += len(new_rows)
+    report.upserted += len(upserts)
+    await catalog_cache.invalidate_products([row["id"] for row in upserts])
+
+
+async def import_products(db, chunks, fmt: str):
+    report = ImportReport()
+    rows = iter_csv_rows(chunks) if fmt == "csv" else iter_ndjson_rows(chunks)
+    batch = []
+
+    async for number, row, errors in rows:
+        report.rows += 1
+        if errors is None:
+            product_id, values, errors = validate_row(row)
+        if errors:
+            report.add_error(number, errors)
+            continue
+
+        batch.append((number, product_id, values))
+        if len(batch) >= config.BULK_IMPORT_BATCH_SIZE:
+            await write_batch(db, batch, report)
+            batch = []
+
+    if batch:
+        await write_batch(db, batch, report)
+
+    ## explicit ids do not advance the PostgreSQL sequence behind products.id
+    if report.upserted and db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("SELECT setval(pg_get_serial_sequence('products', 'id'), (SELECT max(id) FROM products))"))
+        await db.commit()
+
+    return report.as_dict()
+
+
+## CSV/NDJSON body of the export, one chunk per cursor partition; opens its own
+## session because the response body is produced after the request handler returns
+async def export_products(fmt: str):
+    statement = (
+        select(*(getattr(Product, column) for column in EXPORT_COLUMNS))
+        .order_by(Product.id)
+        .execution_options(yield_per=config.BULK_EXPORT_BATCH_SIZE)
+    )
+    if fmt == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\r\n"
+
+    async with open_db() as db:
+        result = await db.stream(statement)
+        async for partition in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(partition)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in partition)
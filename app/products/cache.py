@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request, Response
+from app.core import config, events, read_routing
+from app.core.cache import backend
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Response cache for the public catalog endpoints.
+## Keys are built from the validated, normalized endpoint arguments plus a version
+## token: listings/search use the catalog version, a product detail uses that
+## product's version. invalidate_products() replaces those tokens after a commit, so
+## stale entries are never read again (and a request racing the write stores its
+## result under the old, unreachable key). Entries age out through TTL/LRU.
+## With several workers the entries live in the shared backend; each worker keeps the
+## version tokens for CATALOG_VERSION_TTL and drops them on a "catalog" event, and
+## one worker builds a missing entry while the others wait for it.
+
+CATALOG_VERSION = "catalog:version"
+FILL_LOCK_TTL = 10   # seconds; longer than any catalog query
+FILL_LOCK_WAIT = 5
+
+hits = 0
+misses = 0
+_local_versions = {}
+
+
+def product_version_key(product_id: int):
+    return f"catalog:product:{product_id}:version"
+
+
+def new_version():
+    return uuid.uuid4().hex.encode()
+
+
+## current version token; a missing one (never set or evicted) starts a fresh key space
+async def current_version(key: str):
+    entry = _local_versions.get(key)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    version = await backend.get(key)
+    if version is None:
+        version = new_version()
+        if not await backend.add(key, version):
+            version = await backend.get(key) or version
+    version = version.decode()
+    if config.CATALOG_VERSION_TTL > 0:
+        if len(_local_versions) >= config.CATALOG_CACHE_SIZE:
+            _local_versions.clear()
+        _local_versions[key] = (version, time.monotonic() + config.CATALOG_VERSION_TTL)
+    return version
+
+
+def forget_versions(product_ids):
+    _local_versions.pop(CATALOG_VERSION, None)
+    for product_id in product_ids:
+        _local_versions.pop(product_version_key(product_id), None)
+
+
+## "catalog" event from another worker: comma-separated product ids
+def on_catalog_event(message: str):
+    forget_versions(int(product_id) for product_id in message.split(",") if product_id)
+
+
+events.subscribe("catalog", on_catalog_event)
+
+
+def make_key(kind: str, version: str, params: dict):
+    normalized = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+    return f"catalog:{kind}:{version}:{digest}"
+
+
+def make_etag(body: bytes):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+## entry layout: b"<etag>\n<last-modified epoch>\n<body>"
+def pack(etag: str, modified: int, body: bytes):
+    return f"{etag}\n{modified}\n".encode() + body
+
+
+def unpack(raw: bytes):
+    etag, modified, body = raw.split(b"\n", 2)
+    return etag.decode(), int(modified), body
+
+
+def not_modified(request: Request, etag: str, modified: int):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def respond(request: Request, body: bytes, etag: str, modified: int):
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified, usegmt=True),
+        "Cache-Control": "no-cache",  # clients may keep it but must revalidate
+    }
+    if not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+## serve from the cache or call `build()` (async, returns the JSON body) and store it
+async def cached_response(request: Request, kind: str, params: dict, build, version_key: str = CATALOG_VERSION):
+    global hits, misses
+
+    if config.CATALOG_CACHE_TTL <= 0:
+        body = await build()
+        return respond(request, body, make_etag(body), int(time.time()))
+
+    try:
+        key = make_key(kind, await current_version(version_key), params)
+        raw = await backend.get(key)
+    except Exception as e:
+        logger.warning(f"Catalog cache unavailable: {str(e)}")
+        body = await build()
+        return respond(request, body, make_etag(body), int(time.time()))
+
+    if raw is not None:
+        hits += 1
+        etag, modified, body = unpack(raw)
+        return respond(request, body, etag, modified)
+
+    misses += 1
+    ## a replica may not have the latest product change yet: answer, but do not cache
+    if getattr(request.state, "replica_read", False) and read_routing.catalog_recently_written():
+        body = await build()
+        return respond(request, body, make_etag(body), int(time.time()))
+    etag, modified, body = await fill(key, build)
+    return respond(request, body, etag, modified)
+
+
+## build and store a missing entry (single flight across workers)
+async def fill(key: str, build):
+    async with backend.lock(f"fill:{key}", ttl=FILL_LOCK_TTL, wait=FILL_LOCK_WAIT):
+        raw = await backend.get(key)  # stored by another worker while we waited
+        if raw is not None:
+            return unpack(raw)
+        body = await build()
+        etag, modified = make_etag(body), int(time.time())
+        try:
+            await backend.set(key, pack(etag, modified, body), ttl=config.CATALOG_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Catalog cache write failed: {str(e)}")
+        return etag, modified, body
+
+
+## call after committing a product create/update/delete or a stock change
+async def invalidate_products(product_ids):
+    product_ids = list(product_ids)
+    forget_versions(product_ids)
+    read_routing.catalog_written()
+    try:
+        await backend.set(CATALOG_VERSION, new_version())
+        for product_id in product_ids:
+            await backend.set(product_version_key(product_id), new_version())
+    except Exception as e:
+        logger.error(f"Catalog cache invalidation failed: {str(e)}")
+    await events.publish("catalog", ",".join(str(product_id) for product_id in product_ids))
+
+
+def stats():
+    return {"hits": hits, "misses": misses, "local_versions": len(_local_versions), **backend.stats()}
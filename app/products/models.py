@@ -1,6 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index
 from app.core.database import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+
+
+## canonical form of a category used for filtering ("  Home  Decor" -> "home decor")
+def normalize_category(value: str):
+    return " ".join(value.split()).lower() if value else value
+
+
+def default_category_key(context):
+    return normalize_category(context.get_current_parameters().get("category"))
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -11,8 +21,41 @@ class Product(Base):
     price = Column(Float, nullable=False)
     stock = Column(Integer, nullable=False)
     category = Column(String, nullable=False)
+    category_key = Column(String, nullable=False, default=default_category_key)  # normalized, indexed
     image_url = Column(String, nullable=False)
     
     ## Relationship
     cart_items = relationship("CartItem", back_populates="product", cascade="all, delete-orphan") 
-    
\ No newline at end of file
+
+    ## keep category_key in sync when the category is set through the ORM
+    @validates("category")
+    def validate_category(self, key, value):
+        self.category_key = normalize_category(value)
+        return value
+
+    ## category filter + price sort, keyset pagination on (price, id) / (name, id)
+    __table_args__ = (
+        Index("ix_products_category_price", "category_key", "price"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_name_id", "name", "id"),
+    )
+
+
+## Availability projection of products.stock, read by the catalog and cart checks
+## instead of the products rows checkout writes to. Maintained by database triggers
+## on products (see app.products.availability), so every write path keeps it current.
+class ProductAvailability(Base):
+    __tablename__ = "product_availability"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    available = Column(Integer, nullable=False)    # stock - reserved
+    reserved = Column(Integer, nullable=False, default=0)  # held by open reservations
+    in_stock = Column(Boolean, nullable=False)
+    stock_level = Column(String, nullable=False)   # "out_of_stock", "low_stock" or "in_stock"
+    price = Column(Float, nullable=False)          # copy of products.price, for sorted in_stock listings
+
+    ## in_stock listings run on these, in id and price order
+    __table_args__ = (
+        Index("ix_product_availability_in_stock", "in_stock", "product_id"),
+        Index("ix_product_availability_in_stock_price", "in_stock", "price", "product_id"),
+    )
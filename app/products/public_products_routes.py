@@ -1,66 +1,147 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from app.utils.dependency import get_db
-from app.products.models import Product
-from app.products.schemas import ProductOut
-from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.dependency import get_catalog_read_db
+from app.utils.pagination import fetch_keyset_page
+from app.products.models import Product, ProductAvailability, normalize_category
+from app.products.schemas import CatalogProductOut, CatalogProductPage
+from app.products import search
+from app.products import cache as catalog_cache
+from app.utils.serialization import dumps, rows_to_dicts
+from typing import Literal, Optional, Union
 import logging
 
 logger = logging.getLogger("ecommerce_logger")
 router = APIRouter(prefix="/products", tags=["Public-Products"])
 
-## Public endpoint to list all products with optional filters
-@router.get("/", response_model=list[ProductOut])
-def list_products(
+## keyset columns per sort mode (id last as the tie-breaker)
+SORT_KEYS = {
+    "price": (Product.price, Product.id),
+    "name": (Product.name, Product.id),
+    None: (Product.id,),
+}
+
+## in_stock listings walk the projection's (in_stock, product_id) and
+## (in_stock, price, product_id) indexes, so they visit only matching products;
+## labelled like the products columns they equal, which the cursor reads from the row
+IN_STOCK_SORT_KEYS = {
+    "price": (ProductAvailability.price.label("price"), ProductAvailability.product_id.label("id")),
+    "name": SORT_KEYS["name"],
+    None: (ProductAvailability.product_id.label("id"),),
+}
+
+
+def sort_keys(sort_by: Optional[str], in_stock: Optional[bool]):
+    return (SORT_KEYS if in_stock is None else IN_STOCK_SORT_KEYS)[sort_by]
+
+## list pages are encoded straight from column rows (app.utils.serialization)
+def dump_products(rows):
+    return dumps(rows_to_dicts(rows))
+
+## smallest string greater than every string starting with `prefix`
+def prefix_upper_bound(prefix: str):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+## listing filters; category matches the normalized, indexed category_key
+## (exact or prefix range) so it can use ix_products_category_price, in_stock the
+## projection's indexes (ordered by sort_keys)
+def listing_query(category: Optional[str], category_match: str, min_price: float, max_price: Optional[float], in_stock: Optional[bool] = None):
+    query = search.catalog_select()
+
+    key = normalize_category(category)
+    if key:
+        if category_match == "exact":
+            query = query.where(Product.category_key == key)
+        else:
+            query = query.where(Product.category_key >= key, Product.category_key < prefix_upper_bound(key))
+    price = Product.price if in_stock is None else ProductAvailability.price
+    if min_price is not None:
+        query = query.where(price >= min_price)
+    if max_price is not None:
+        query = query.where(price <= max_price)
+    if in_stock is not None:
+        query = query.where(ProductAvailability.in_stock == in_stock)
+    return query
+
+
+## Public endpoint to list all products with optional filters (served through the catalog cache)
+@router.get("/", response_model=Union[list[CatalogProductOut], CatalogProductPage])
+async def list_products(
+    request: Request,
     category: Optional[str] = None,
+    category_match: Literal["prefix", "exact"] = Query("prefix", description="Match category exactly or by prefix (case-insensitive)"),
     min_price: float = 0,
     max_price: Optional[float] = None,
+    in_stock: Optional[bool] = Query(None, description="Only products that are (true) or are not (false) available"),
     sort_by: Optional[Literal["price", "name"]] = Query(None, description="Sort by 'price' or 'name' only"),
-    page: int = 1,
-    page_size: int = 10,
-    db: Session = Depends(get_db)
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor mode: pass an empty cursor for the first page, then next_cursor"),
+    db: AsyncSession = Depends(get_catalog_read_db)
 ):
-    query = db.query(Product)
+    async def build():
+        query = listing_query(category, category_match, min_price, max_price, in_stock)
 
-    if category:
-        query = query.filter(func.lower(Product.category).like(f"%{category.lower()}%"))
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
+        if cursor is not None:
+            items, next_cursor = await fetch_keyset_page(
+                db, query, sort_by or "id", sort_keys(sort_by, in_stock), cursor, page_size, scalars=False
+            )
+            return dumps({"items": rows_to_dicts(items), "next_cursor": next_cursor})
 
-    if sort_by == "price":
-        query = query.order_by(Product.price)
-    elif sort_by == "name":
-        query = query.order_by(Product.name)
+        if sort_by is not None or in_stock is not None:
+            query = query.order_by(sort_keys(sort_by, in_stock)[0])
 
-    offset = (page - 1) * page_size
-    return query.offset(offset).limit(page_size).all()
+        offset = (page - 1) * page_size
+        result = await db.execute(query.offset(offset).limit(page_size))
+        return dump_products(result.all())
 
+    key = normalize_category(category)
+    params = {
+        "category": key or None,
+        "category_match": category_match if key else None,
+        "min_price": min_price,
+        "max_price": max_price,
+        "in_stock": in_stock,
+        "sort_by": sort_by,
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "cursor": cursor,
+    }
+    return await catalog_cache.cached_response(request, "list", params, build)
 
-#view products by keyword in name or description.
-@router.get("/search", response_model=list[ProductOut])
-def search_products(keyword: str = Query(..., min_length=1),db: Session = Depends(get_db)):
+
+#view products by keyword in name or description, ranked by relevance.
+@router.get("/search", response_model=list[CatalogProductOut])
+async def search_products(
+    request: Request,
+    keyword: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_catalog_read_db)
+):
     logger.info(f"Searching products with keyword: {keyword}")
-    keyword = keyword.lower()
-    query = db.query(Product).filter(
-        or_(
-            func.lower(Product.name).like(f"%{keyword}%"),
-            func.lower(Product.description).like(f"%{keyword}%")
-        )
-    )
-    
-    return query.all()
+
+    async def build():
+        return dump_products(await search.search_products(db, keyword, page=page, page_size=page_size))
+
+    params = {"tokens": search.tokenize(keyword), "page": page, "page_size": page_size}
+    return await catalog_cache.cached_response(request, "search", params, build)
 
 ##public endpoints to view product
-@router.get("/{id}", response_model=ProductOut)
-def get_product_detail(id: int, db: Session = Depends(get_db)):
+@router.get("/{id}", response_model=CatalogProductOut)
+async def get_product_detail(request: Request, id: int, db: AsyncSession = Depends(get_catalog_read_db)):
 
     logger.info(f"Fetching product with ID: {id}")
-    product = db.query(Product).filter_by(id=id).first()
 
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    async def build():
+        result = await db.execute(search.catalog_select().where(Product.id == id))
+        product = result.first()
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return dumps(product._asdict())
+
+    return await catalog_cache.cached_response(
+        request, "product", {"id": id}, build, version_key=catalog_cache.product_version_key(id)
+    )
 
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils.dependency import get_db, require_admin 
 from app.products import schemas, models
+from app.products import cache as catalog_cache
+from app.products import bulk
+from app.products.search import PRODUCT_COLUMNS
+from app.utils.serialization import json_response, rows_to_dicts
+from app.utils.pagination import fetch_keyset_page
+from typing import Literal, Optional, Union
 from app.orders.models import OrderItem
 import logging
 
@@ -14,12 +22,13 @@ router = APIRouter(prefix="/admin/products", tags=["Admin-Products"])
 
 ## endpoint for create a product
 @router.post("/", response_model=schemas.ProductOut)
-def create_product(data: schemas.ProductCreate, db: Session = Depends(get_db), _ = Depends(require_admin)):
+async def create_product(data: schemas.ProductCreate, db: AsyncSession = Depends(get_db), _ = Depends(require_admin)):
     try:
         product = models.Product(**data.model_dump())
         db.add(product)
-        db.commit()
-        db.refresh(product)
+        await db.commit()
+        await db.refresh(product)
+        await catalog_cache.invalidate_products([product.id])
         logger.info(f"Product created with ID: {product.id}")
         return product
     
@@ -31,22 +40,79 @@ def create_product(data: schemas.ProductCreate, db: Session = Depends(get_db), _
         raise HTTPException(status_code=500, detail="Failed to create product")
 
 #endpoint for view all product
-@router.get("/", response_model=list[schemas.ProductOut])
-def get_products(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), _ = Depends(require_admin)):
+@router.get("/", response_model=Union[list[schemas.ProductOut], schemas.ProductPage])
+async def get_products(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    _ = Depends(require_admin)
+):
     try:
-        products = db.query(models.Product).offset(skip).limit(limit).all()
+        query = select(*PRODUCT_COLUMNS)
+        if cursor is not None:
+            rows, next_cursor = await fetch_keyset_page(
+                db, query, "id", (models.Product.id,), cursor, limit, scalars=False
+            )
+            logger.info("Fetched products page")
+            return json_response({"items": rows_to_dicts(rows), "next_cursor": next_cursor})
+
+        result = await db.execute(query.offset(skip).limit(limit))
         logger.info("Fetched all products")
-        return products
+        return json_response(rows_to_dicts(result.all()))
+
+    except HTTPException as http_exc:
+         raise http_exc
+
     except Exception as e:
         logger.error(f"Error fetching products: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch products")
 
 
+## bulk import: streamed CSV (header row) or NDJSON body, validated per row and
+## written in batched INSERT / upsert chunks; rows carrying an id update that product
+@router.post("/import", response_model=schemas.ProductImportReport)
+async def import_products(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults from Content-Type, else csv"),
+    db: AsyncSession = Depends(get_db),
+    _ = Depends(require_admin)
+):
+    try:
+        if format is None:
+            content_type = request.headers.get("content-type", "")
+            format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+        report = await bulk.import_products(db, request.stream(), format)
+        logger.info(
+            f"Bulk import: {report['created']} created, {report['upserted']} upserted, "
+            f"{report['failed']} failed in {report['seconds']}s"
+        )
+        return report
+
+    except HTTPException as http_exc:
+         raise http_exc
+
+    except Exception as e:
+        logger.error(f"Bulk import failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import products")
+
+## bulk export streamed from a server-side cursor
+@router.get("/export")
+async def export_products(format: Literal["csv", "ndjson"] = "csv", _ = Depends(require_admin)):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    logger.info(f"Bulk export started ({format})")
+    return StreamingResponse(
+        bulk.export_products(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
 ## endpoint for view a product by id
 @router.get("/{id}", response_model=schemas.ProductOut)
-def get_product(id: int, db: Session = Depends(get_db), _ = Depends(require_admin)):
+async def get_product(id: int, db: AsyncSession = Depends(get_db), _ = Depends(require_admin)):
     try:
-        product = db.query(models.Product).filter_by(id=id).first()
+        product = await db.get(models.Product, id)
         if not product:
             logger.warning(f"Product with ID {id} not found")
             raise HTTPException(status_code=404, detail="Product not found")
@@ -62,9 +128,9 @@ def get_product(id: int, db: Session = Depends(get_db), _ = Depends(require_admi
 
 ## endpoint for update a product
 @router.put("/{id}", response_model=schemas.ProductOut)
-def update_product(id: int, data: schemas.ProductUpdate, db: Session = Depends(get_db), _ = Depends(require_admin)):
+async def update_product(id: int, data: schemas.ProductUpdate, db: AsyncSession = Depends(get_db), _ = Depends(require_admin)):
     try:
-        product = db.query(models.Product).filter_by(id=id).first()
+        product = await db.get(models.Product, id)
         if not product:
             logger.warning(f"Product with ID {id} not found for update")
             raise HTTPException(status_code=404, detail="Product not found")
@@ -73,8 +139,9 @@ def update_product(id: int, data: schemas.ProductUpdate, db: Session = Depends(g
         for key, value in update_data.items():
             setattr(product, key, value)
         
-        db.commit()
-        db.refresh(product)
+        await db.commit()
+        await db.refresh(product)
+        await catalog_cache.invalidate_products([id])
         logger.info(f"Product with ID {id} updated")
         return product
     
@@ -87,17 +154,18 @@ def update_product(id: int, data: schemas.ProductUpdate, db: Session = Depends(g
 
 ## endpoint for deleting a product
 @router.delete("/{id}")
-def delete_product(id: int, db: Session = Depends(get_db), _ = Depends(require_admin)):
+async def delete_product(id: int, db: AsyncSession = Depends(get_db), _ = Depends(require_admin)):
     try:
-        product = db.query(models.Product).filter_by(id=id).first()
+        product = await db.get(models.Product, id)
         if not product:
             logger.warning(f"Product with ID {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Product not found")
         
-        db.query(OrderItem).filter_by(product_id=id).update({OrderItem.product_id: None})
+        await db.execute(update(OrderItem).filter_by(product_id=id).values(product_id=None))
 
-        db.delete(product)
-        db.commit()
+        await db.delete(product)
+        await db.commit()
+        await catalog_cache.invalidate_products([id])
         logger.info(f"Product with ID {id} deleted")
         return {"message": "Product deleted"}
     
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Literal, Optional
 
 class ProductBase(BaseModel):
     name: str
@@ -62,3 +62,32 @@ class ProductOut(ProductBase):
     model_config = {
         "from_attributes": True
     }
+
+## page returned in cursor mode
+class ProductPage(BaseModel):
+    items: list[ProductOut]
+    next_cursor: Optional[str] = None
+
+## public catalog view: stock is the available quantity from the availability projection
+class CatalogProductOut(ProductOut):
+    in_stock: bool
+    stock_level: Literal["out_of_stock", "low_stock", "in_stock"]
+
+class CatalogProductPage(BaseModel):
+    items: list[CatalogProductOut]
+    next_cursor: Optional[str] = None
+
+## bulk import result: per-row validation/database errors and throughput
+class ProductImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+class ProductImportReport(BaseModel):
+    rows: int
+    created: int
+    upserted: int
+    failed: int
+    errors: list[ProductImportError]
+    errors_truncated: bool
+    seconds: float
+    rows_per_second: float
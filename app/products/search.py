@@ -0,0 +1,169 @@
+import re
+from sqlalchemy import Boolean, select, text, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.products.models import Product, ProductAvailability
+from app.products.schemas import ProductOut
+from app.utils.serialization import schema_columns
+
+## Full-text search index for products.
+## SQLite uses an external-content FTS5 table kept in sync by triggers,
+## PostgreSQL uses a GIN index over a tsvector expression.
+
+FTS_TABLE = "products_fts"
+
+## column rows shaped like ProductOut (admin) and CatalogProductOut (public catalog),
+## not ORM objects; catalog stock comes from the availability projection
+PRODUCT_COLUMNS = schema_columns(Product, ProductOut)
+CATALOG_COLUMNS = [
+    ProductAvailability.available.label("stock") if column.key == "stock" else column for column in PRODUCT_COLUMNS
+] + [ProductAvailability.in_stock, ProductAvailability.stock_level]
+SELECT_LIST = ", ".join(
+    "product_availability.available AS stock" if column.key == "stock" else f"products.{column.key}"
+    for column in PRODUCT_COLUMNS
+) + ", product_availability.in_stock, product_availability.stock_level"
+
+
+def catalog_select():
+    return select(*CATALOG_COLUMNS).join_from(Product, ProductAvailability, ProductAvailability.product_id == Product.id)
+
+## weights for bm25 / ts_rank -> a hit in the name ranks above a hit in the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+SQLITE_INDEX_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, coalesce(new.description, ''));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, coalesce(old.description, ''));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, coalesce(old.description, ''));
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, coalesce(new.description, ''));
+    END
+    """,
+]
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
+PG_INDEX_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_products_search ON products USING GIN (({PG_DOCUMENT}))",
+]
+
+PG_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_products_search",
+]
+
+
+## create the search index (idempotent), backfilling it when it is created on an existing table
+def create_search_index(conn):
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE},
+        ).first()
+        for ddl in SQLITE_INDEX_DDL:
+            conn.execute(text(ddl))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+    elif dialect == "postgresql":
+        for ddl in PG_INDEX_DDL:
+            conn.execute(text(ddl))
+
+
+def drop_search_index(conn):
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        for ddl in SQLITE_DROP_DDL:
+            conn.execute(text(ddl))
+    elif dialect == "postgresql":
+        for ddl in PG_DROP_DDL:
+            conn.execute(text(ddl))
+
+
+## split the user keyword into plain word tokens (drops FTS operators/quotes)
+def tokenize(keyword: str):
+    return re.findall(r"\w+", keyword.lower())
+
+
+## every token must match, each as a prefix so search works while typing
+def build_sqlite_query(tokens):
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def build_pg_query(tokens):
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+## search products ranked by relevance, paginated
+async def search_products(db: AsyncSession, keyword: str, page: int = 1, page_size: int = 10):
+    tokens = tokenize(keyword)
+    if not tokens:
+        return []
+
+    offset = (page - 1) * page_size
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        statement = text(f"""
+            SELECT {SELECT_LIST} FROM {FTS_TABLE}
+            JOIN products ON products.id = {FTS_TABLE}.rowid
+            JOIN product_availability ON product_availability.product_id = products.id
+            WHERE {FTS_TABLE} MATCH :query
+            ORDER BY bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}), products.id
+            LIMIT :limit OFFSET :offset
+        """).columns(in_stock=Boolean)
+        params = {"query": build_sqlite_query(tokens), "limit": page_size, "offset": offset}
+        result = await db.execute(statement, params)
+        return result.all()
+
+    if dialect == "postgresql":
+        statement = text(f"""
+            SELECT {SELECT_LIST} FROM products
+            JOIN product_availability ON product_availability.product_id = products.id
+            WHERE ({PG_DOCUMENT}) @@ to_tsquery('english', :query)
+            ORDER BY ts_rank(({PG_DOCUMENT}), to_tsquery('english', :query)) DESC, products.id
+            LIMIT :limit OFFSET :offset
+        """).columns(in_stock=Boolean)
+        params = {"query": build_pg_query(tokens), "limit": page_size, "offset": offset}
+        result = await db.execute(statement, params)
+        return result.all()
+
+    ## no index available for this dialect -> fall back to a paginated LIKE scan
+    query = catalog_select()
+    for token in tokens:
+        query = query.where(or_(
+            func.lower(Product.name).like(f"%{token}%"),
+            func.lower(Product.description).like(f"%{token}%"),
+        ))
+    result = await db.execute(query.order_by(Product.id).offset(offset).limit(page_size))
+    return result.all()
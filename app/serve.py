@@ -0,0 +1,53 @@
+import logging
+import os
+import sys
+from app.core import config
+
+logger = logging.getLogger("ecommerce_logger")
+
+## Production launcher: runs WORKERS uvicorn worker processes on HOST:PORT, each
+## building its own app through create_app(). Workers share state only through the
+## database and the shared cache backend (catalog cache, rate-limit counters, locks,
+## invalidation events), so more than one worker needs CACHE_BACKEND=sqlite (same
+## node) or redis (any number of nodes); "memory" is switched to "sqlite" here.
+## usage: WORKERS=4 python -m app.serve   (or python -m app.serve --workers 4)
+
+
+## settings are passed to the workers through the environment they inherit
+def prepare(workers: int):
+    if workers > 1:
+        url = config.DATABASE_URL
+        if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:")):
+            sys.exit("an in-memory SQLite database cannot be shared by several workers; set DATABASE_URL")
+        if config.CACHE_BACKEND == "memory":
+            logger.warning(f"CACHE_BACKEND=memory is per process; using sqlite ({config.CACHE_SQLITE_PATH}) for {workers} workers")
+            os.environ["CACHE_BACKEND"] = "sqlite"
+
+    ## create the schema once here rather than in every worker at the same time
+    if config.DB_CREATE_SCHEMA:
+        from app.core.schema import create_schema
+        create_schema()
+        os.environ["DB_CREATE_SCHEMA"] = "false"
+
+
+def main():
+    import uvicorn
+    from app.core.logging_config import setup_logging
+
+    workers = config.WORKERS
+    if len(sys.argv) > 2 and sys.argv[1] == "--workers":
+        workers = int(sys.argv[2])
+    setup_logging()
+    prepare(workers)
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=config.HOST,
+        port=config.PORT,
+        workers=workers,
+        log_level=config.LOG_LEVEL.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,142 @@
-
-from fastapi import Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from app.auth import models, utils
-from app.core.database import SessionLocal
+from jose.exceptions import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import models
+from app.auth.identity_cache import CurrentUser, identity_cache
+from app.auth.token_cache import decode_access_token
+from app.core import read_routing
+from app.core.config import ASYNC_DB, AUTH_CLAIMS_FAST_PATH
+from app.core.database import (
+    SessionLocal, AsyncSessionLocal, SyncSessionAdapter, sync_session_slots,
+    ReplicaSessions, AsyncReplicaSessions, replica_session_slots,
+)
 
 bearer_scheme = HTTPBearer()  
+optional_bearer = HTTPBearer(auto_error=False)
+
+## yields an AsyncSession in async mode, otherwise the sync session behind the same awaitable API
+async def get_db():
+    if ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        async with sync_session_slots:
+            db = SyncSessionAdapter(SessionLocal())
+            try:
+                yield db
+            finally:
+                await db.close()
+
+## the same session outside the dependency system, for work that outlives the
+## request scope (a StreamingResponse body is produced after the handler returns)
+open_db = asynccontextmanager(get_db)
+
+_next_replica = 0
+
 
-def get_db():
-    db = SessionLocal()
+## round-robin over the configured replicas
+def replica_sessionmaker():
+    global _next_replica
+    sessions = AsyncReplicaSessions if ASYNC_DB else ReplicaSessions
+    _next_replica = (_next_replica + 1) % len(sessions)
+    return sessions[_next_replica]
+
+
+## the caller's recent writes must be read back from the primary
+async def reads_from_primary(token: HTTPAuthorizationCredentials = None):
+    if token is None:
+        return False
     try:
+        subject = decode_access_token(token.credentials).get("sub")
+    except JWTError:
+        return False
+    return bool(subject) and await read_routing.recently_wrote(subject)
+
+
+## a replica when DATABASE_REPLICA_URLS is set, unless inside the caller's read-your-writes window
+async def reads_from_replica(token: HTTPAuthorizationCredentials = None):
+    return bool(ReplicaSessions) and not await reads_from_primary(token)
+
+
+## session for read-only endpoints, on a replica or the primary. `primary` is the
+## request's get_db session when it already has one: opening a second would hold two
+## sync_session_slots permits at once, which deadlocks once the slots run out.
+async def read_session(replica: bool, primary=None):
+    if not replica:
+        if primary is not None:
+            yield primary
+            return
+        async with open_db() as db:
+            yield db
+    elif ASYNC_DB:
+        async with replica_sessionmaker()() as db:
+            yield db
+    else:
+        async with replica_session_slots:
+            db = SyncSessionAdapter(replica_sessionmaker()())
+            try:
+                yield db
+            finally:
+                await db.close()
+
+
+## for authenticated endpoints, whose get_current_user already holds a get_db session
+async def get_read_db(
+    token: HTTPAuthorizationCredentials = Depends(optional_bearer),
+    db: AsyncSession = Depends(get_db),
+):
+    async for session in read_session(await reads_from_replica(token), primary=db):
+        yield session
+
+
+## the public catalog endpoints have no other session, so the primary one is opened
+## here; request.state.replica_read tells the catalog cache where the rows came from
+async def get_catalog_read_db(request: Request, token: HTTPAuthorizationCredentials = Depends(optional_bearer)):
+    replica = await reads_from_replica(token)
+    request.state.replica_read = replica
+    async for db in read_session(replica):
         yield db
-    finally:
-        db.close()
 
 # Get Current User from JWT
-def get_current_user(
+async def get_current_user(
     token: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        payload = jwt.decode(token.credentials, utils.SECRET_KEY, algorithms=[utils.ALGORITHM])
+        payload = decode_access_token(token.credentials)
         email = payload.get("sub")
-        role = payload.get("role")
-        user = db.query(models.User).filter_by(email=email).first()
-        if user is None:
+
+        ## claims-only mode: no identity cache or users table lookup
+        if AUTH_CLAIMS_FAST_PATH:
+            user = CurrentUser.from_claims(payload)
+            if user is not None:
+                return user
+
+        user = identity_cache.get(email)
+        if user is not None:
+            return user
+
+        result = await db.execute(select(models.User).filter_by(email=email))
+        db_user = result.scalars().first()
+        if db_user is None:
             raise HTTPException(status_code=401, detail="User not found")
+        user = CurrentUser.from_model(db_user)
+        identity_cache.put(email, user)
         return user
     except JWTError:
         raise HTTPException(status_code=401, detail="Token error")
 
 # Admin-only dependency
-def require_admin(current_user: models.User = Depends(get_current_user)):
+async def require_admin(current_user: CurrentUser = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admins only")
     return current_user
 
 ## User-only dependency
-def require_user(current_user: models.User = Depends(get_current_user)):
+async def require_user(current_user: CurrentUser = Depends(get_current_user)):
     if current_user.role != "user":
         raise HTTPException(status_code=403, detail="Users only")
     return current_user
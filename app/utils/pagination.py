@@ -0,0 +1,48 @@
+import base64
+import json
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+## Keyset (cursor) pagination: instead of OFFSET the next page seeks past the last
+## row's sort key, so a deep page costs the same as the first one.
+## The cursor is an opaque base64 token holding the sort mode and the last key.
+
+
+def encode_cursor(sort: str, values):
+    payload = json.dumps({"s": sort, "k": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["k"]
+        if payload["s"] != sort or len(values) != len(columns):
+            raise ValueError("cursor does not match the requested sort")
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+## fetch one page ordered by `columns` (the last one must be unique, e.g. the id);
+## an empty cursor starts from the beginning. Returns (items, next_cursor).
+## Column-select queries pass scalars=False to get rows instead of ORM objects.
+async def fetch_keyset_page(db, query, sort: str, columns, cursor: str, page_size: int, descending: bool = False, scalars: bool = True):
+    if page_size < 1:
+        raise HTTPException(status_code=400, detail="page_size must be at least 1")
+    if cursor:
+        values = decode_cursor(cursor, sort, columns)
+        key = tuple_(*columns)
+        query = query.where(key < tuple_(*values) if descending else key > tuple_(*values))
+
+    order = [column.desc() if descending else column for column in columns]
+    result = await db.execute(query.order_by(*order).limit(page_size + 1))
+    items = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+    return items, next_cursor
@@ -0,0 +1,35 @@
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pydantic-core's encoder is the fallback
+    orjson = None
+
+## Fast path for list endpoints: select only the columns of the response schema and
+## encode the rows straight to JSON, without loading ORM objects, validating them
+## with from_attributes and running jsonable_encoder. The values come from our own
+## tables, so they already match the schema. `response_model` stays on the routes
+## for the OpenAPI docs; handlers return the encoded body as a Response.
+
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return pydantic_core.to_json(content)
+
+
+## model columns for the schema's fields, in the schema's field order (= JSON key order)
+def schema_columns(model, schema, exclude=()):
+    return [getattr(model, name) for name in schema.model_fields if name not in exclude]
+
+
+def rows_to_dicts(rows):
+    return [row._asdict() for row in rows]
+
+
+def json_response(content, status_code: int = 200):
+    return Response(dumps(content), status_code=status_code, media_type="application/json")
@@ -0,0 +1,95 @@
+## Throughput of the sync (threadpool) path vs the opt-in async path (ASYNC_DB=1).
+## Starts uvicorn in a scratch directory for each mode and drives GET /products/
+## at increasing concurrency.
+## usage: python -m benchmarks.async_load_benchmark [concurrency...]   (default 10 50 200)
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from sqlalchemy import create_engine
+from app.core.schema import create_schema
+from app.products.models import Product
+from app.auth import models as auth_models
+from app.cart import models as cart_models
+from app.orders import models as order_models
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8765
+REQUESTS = 2000
+PRODUCTS = 5000
+
+
+def seed(workdir):
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'ecommerce.db')}")
+    create_schema(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Product.__table__.insert(), [{
+            "name": f"Product {i}",
+            "description": "benchmark product",
+            "price": float(i % 500 + 1),
+            "stock": 10,
+            "category": "Bench",
+            "image_url": "https://example.jpg",
+        } for i in range(PRODUCTS)])
+    engine.dispose()
+
+
+def start_server(workdir, async_db):
+    env = dict(os.environ, PYTHONPATH=ROOT, ASYNC_DB="1" if async_db else "0")
+    os.makedirs(os.path.join(workdir, "logs"), exist_ok=True)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client):
+    for _ in range(100):
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def drive(client, concurrency):
+    remaining = REQUESTS
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.get("/products/", params={"sort_by": "price", "page": 3})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def measure(async_db, levels):
+    with tempfile.TemporaryDirectory() as workdir:
+        seed(workdir)
+        server = start_server(workdir, async_db)
+        try:
+            limits = httpx.Limits(max_connections=max(levels))
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+                await wait_ready(client)
+                await drive(client, 10)  # warm-up
+                return {level: await drive(client, level) for level in levels}
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    levels = [int(arg) for arg in sys.argv[1:]] or [10, 50, 200]
+    sync_rps = asyncio.run(measure(False, levels))
+    async_rps = asyncio.run(measure(True, levels))
+    print(f"{'concurrency':>11} | {'sync rps':>9} | {'async rps':>9}")
+    for level in levels:
+        print(f"{level:>11} | {sync_rps[level]:9.1f} | {async_rps[level]:9.1f}")
@@ -0,0 +1,99 @@
+## Microbenchmarks for access-token verification and the auth dependency chain
+## (get_current_user -> require_admin), per call, in a scratch SQLite database.
+## usage: python -m benchmarks.auth_benchmark [iterations]   (default 20000)
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'ecommerce.db')}"
+
+from fastapi.security import HTTPAuthorizationCredentials
+from app.core.database import Base, engine, SessionLocal, SyncSessionAdapter
+from app.auth import models, utils
+from app.products import models as product_models
+from app.cart import models as cart_models
+from app.orders import models as order_models
+from app.auth import token_cache as tokens
+from app.auth.identity_cache import identity_cache
+from app.utils import dependency
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def async_per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def seed_admin():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = models.User(name="Bench Admin", email="bench@example.com", hashed_password="x", role="admin")
+        db.add(user)
+        db.commit()
+        return {"sub": user.email, "role": "admin", "uid": user.id, "name": user.name}
+
+
+async def dependency_chain(iterations, token):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    db = SyncSessionAdapter(SessionLocal())
+
+    async def call():
+        user = await dependency.get_current_user(credentials, db)
+        return await dependency.require_admin(user)
+
+    def cold():
+        tokens.token_cache.clear()
+        identity_cache.clear()
+
+    results = {}
+    dependency.AUTH_CLAIMS_FAST_PATH = False
+
+    async def uncached():
+        cold()
+        await call()
+    results["no caches (verify + users query)"] = await async_per_call_us(uncached, max(iterations // 10, 1))
+
+    async def identity_only():
+        tokens.token_cache.clear()
+        await call()
+    results["identity cache only"] = await async_per_call_us(identity_only, iterations)
+
+    results["token + identity cache"] = await async_per_call_us(call, iterations)
+
+    dependency.AUTH_CLAIMS_FAST_PATH = True
+    results["token cache + claims fast path"] = await async_per_call_us(call, iterations)
+
+    await db.close()
+    return results
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    claims = seed_admin()
+    token = utils.create_access_token(claims)
+
+    print("token verification (us/call)")
+    decoders = {"jose": tokens.decode_jose, "hmac": tokens.decode_hmac}
+    try:
+        decoders["pyjwt"] = tokens.pyjwt_decoder()
+    except RuntimeError:
+        pass
+    for name, decode in decoders.items():
+        print(f"  {name:<40} {per_call_us(lambda: decode(token), iterations):8.2f}")
+    tokens.token_cache.put(token, tokens.decode(token))
+    print(f"  {'token cache hit':<40} {per_call_us(lambda: tokens.decode_access_token(token), iterations):8.2f}")
+
+    print(f"dependency chain get_current_user -> require_admin (us/call, JWT_BACKEND={tokens.JWT_BACKEND})")
+    for name, value in asyncio.run(dependency_chain(iterations, token)).items():
+        print(f"  {name:<40} {value:8.2f}")
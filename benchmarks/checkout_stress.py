@@ -0,0 +1,99 @@
+## Checkout stress check: many users race for the same low-stock product and
+## stock must never go negative (no oversell); the number of SQL statements per
+## checkout must not grow with the number of cart lines.
+## usage: python -m benchmarks.checkout_stress [buyers] [stock]   (default 50 10)
+import asyncio
+import os
+import sys
+import tempfile
+
+WORKDIR = tempfile.mkdtemp(prefix="checkout_stress_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'stress.db')}")
+os.makedirs(os.path.join(WORKDIR, "logs"), exist_ok=True)
+os.chdir(WORKDIR)
+
+import httpx
+from sqlalchemy import event, select, func
+from app.main import app
+from app.core.database import engine, async_engine, SessionLocal
+from app.core.schema import create_schema
+from app.auth import utils
+from app.auth.models import User
+from app.products.models import Product
+from app.cart.models import CartItem
+from app.orders.models import OrderItem
+
+
+def seed(buyers: int, stock: int, catalog: int = 30):
+    create_schema()
+    hashed = utils.hash_password("Passw0rd!")
+    with SessionLocal() as db:
+        db.add_all(User(name=f"Buyer {i}", email=f"buyer{i}@bench.com", hashed_password=hashed, role="user")
+                   for i in range(buyers))
+        db.add(Product(name="Hot item", description="limited", price=99.0, stock=stock, category="Bench", image_url="x"))
+        db.add_all(Product(name=f"Item {i}", description="plenty", price=1.0, stock=10**6, category="Bench", image_url="x")
+                   for i in range(catalog))
+        db.commit()
+
+
+def token(i: int):
+    return {"Authorization": f"Bearer {utils.create_access_token({'sub': f'buyer{i}@bench.com', 'role': 'user'})}"}
+
+
+async def race(client, buyers: int):
+    for i in range(buyers):
+        response = await client.post("/cart/", json={"product_id": 1, "quantity": 1}, headers=token(i))
+        response.raise_for_status()
+    responses = await asyncio.gather(*(client.post("/checkout/", headers=token(i)) for i in range(buyers)))
+    return sum(r.status_code == 200 for r in responses), sum(r.status_code == 400 for r in responses)
+
+
+async def statements_per_checkout(client, buyer: int, lines: int):
+    for product_id in range(2, 2 + lines):
+        response = await client.post("/cart/", json={"product_id": product_id, "quantity": 1}, headers=token(buyer))
+        response.raise_for_status()
+
+    count = 0
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        nonlocal count
+        count += 1
+
+    target = async_engine.sync_engine if async_engine is not None else engine
+    event.listen(target, "before_cursor_execute", on_execute)
+    try:
+        response = await client.post("/checkout/", headers=token(buyer))
+        response.raise_for_status()
+    finally:
+        event.remove(target, "before_cursor_execute", on_execute)
+    return count
+
+
+async def main(buyers: int, stock: int):
+    seed(buyers, stock)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+        placed, rejected = await race(client, buyers)
+
+        with SessionLocal() as db:
+            remaining = db.get(Product, 1).stock
+            sold = db.scalar(select(func.coalesce(func.sum(OrderItem.quantity), 0)).where(OrderItem.product_id == 1))
+            db.query(CartItem).delete()
+            db.commit()
+
+        print(f"{buyers} buyers raced for {stock} units: {placed} orders placed, {rejected} rejected, "
+              f"{sold} sold, {remaining} left")
+        assert remaining >= 0 and sold + remaining == stock and placed == min(buyers, stock), "oversell detected"
+
+        counts = {lines: await statements_per_checkout(client, buyer, lines) for buyer, lines in enumerate((1, 5, 20))}
+        print("SQL statements per checkout by cart lines:", counts)
+        assert len(set(counts.values())) == 1, "statement count grows with the cart size"
+
+    if async_engine is not None:
+        await async_engine.dispose()
+    print("ok")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args or [50, 10])))
@@ -0,0 +1,68 @@
+## EXPLAIN QUERY PLAN check for the product listing queries: each filter/sort
+## combination must be served by an index, not a full scan of products.
+## usage: python -m benchmarks.explain_listing
+import os
+import re
+import tempfile
+from sqlalchemy import create_engine, text
+from app.core.schema import create_schema
+from app.products.public_products_routes import listing_query, sort_keys
+from app.products.models import Product
+from app.auth import models as auth_models
+from app.cart import models as cart_models
+from app.orders import models as order_models
+
+CASES = [
+    # (description, filters, sort_by, expected index)
+    ("category exact, sort price", dict(category="Furniture", category_match="exact"), "price", "ix_products_category_price"),
+    ("category prefix, sort price", dict(category="furn", category_match="prefix"), "price", "ix_products_category_price"),
+    ("category prefix", dict(category="Furn", category_match="prefix"), None, "ix_products_category_price"),
+    ("sort price", dict(), "price", "ix_products_price_id"),
+    ("sort name", dict(), "name", "ix_products_name_id"),
+    ("in stock", dict(in_stock=True), None, "ix_product_availability_in_stock"),
+    ("out of stock", dict(in_stock=False), None, "ix_product_availability_in_stock"),
+    ("in stock, sort price", dict(in_stock=True), "price", "ix_product_availability_in_stock_price"),
+    ("in stock, price range", dict(in_stock=True, min_price=10, max_price=20), "price", "ix_product_availability_in_stock_price"),
+    ## name and category are not in the projection: the matching rows are sorted by
+    ## name, and each one's category is checked on its products row
+    ("in stock, sort name", dict(in_stock=True), "name", "ix_product_availability_in_stock_price"),
+    ("in stock, category", dict(in_stock=True, category="Decor", category_match="exact"), None, "ix_product_availability_in_stock"),
+]
+
+
+def plan(conn, query):
+    compiled = query.compile(conn, compile_kwargs={"literal_binds": True})
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'explain.db')}")
+        create_schema(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(Product.__table__.insert(), [{
+                "name": f"Product {i}", "description": "explain", "price": float(i % 97),
+                "stock": 0 if i % 50 == 0 else 5, "category": ["Furniture", "Appliances", "Decor"][i % 3], "image_url": "x",
+            } for i in range(3000)])
+            conn.execute(text("ANALYZE"))
+
+        failures = 0
+        with engine.connect() as conn:
+            for description, filters, sort_by, expected in CASES:
+                filters = {"category": None, "category_match": "prefix", "min_price": 0, "max_price": None, "in_stock": None, **filters}
+                query = listing_query(**filters)
+                if sort_by or filters["in_stock"] is not None:
+                    query = query.order_by(*sort_keys(sort_by, filters["in_stock"]))
+                detail = plan(conn, query.limit(10))
+                status = "ok" if re.search(rf"\b{expected}\b", detail) else "FAIL"
+                failures += status == "FAIL"
+                print(f"{status:4} {description:28} {detail}")
+        engine.dispose()
+
+    if failures:
+        raise SystemExit(f"{failures} listing queries do not use the expected index")
+
+
+if __name__ == "__main__":
+    main()
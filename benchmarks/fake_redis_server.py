@@ -0,0 +1,33 @@
+## Local Redis-protocol stand-in for CACHE_BACKEND=redis, built on fakeredis'
+## TCP server (pip install fakeredis). It keeps everything in this process's memory
+## and supports the commands the redis backend uses (GET/SET NX PX, INCRBY,
+## WATCH/MULTI, PUBLISH/SUBSCRIBE), not Lua scripting.
+## usage: python -m benchmarks.fake_redis_server [--port 6390]
+##        CACHE_BACKEND=redis CACHE_URL=redis://127.0.0.1:6390/0 WORKERS=4 python -m app.serve
+import argparse
+import threading
+
+
+def start(host: str = "127.0.0.1", port: int = 6390):
+    from fakeredis import TcpFakeServer
+    server = TcpFakeServer((host, port), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an in-memory Redis stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    server = start(args.host, args.port)
+    print(f"fake redis listening on redis://{args.host}:{args.port}/0")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
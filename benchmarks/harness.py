@@ -0,0 +1,255 @@
+## Reproducible benchmark of the API hot paths.
+## Seeds a scratch database with seed_data.seed_dataset (N users, M products, K orders),
+## drives each scenario against the real app in-process (httpx ASGITransport) and/or
+## over uvicorn, and reports p50/p95/p99 latency and requests/second per endpoint.
+## Results are saved as JSON; --compare marks regressions against an earlier run
+## and exits with status 1 when there are any.
+## usage: python -m benchmarks.harness [--users 50 --products 5000 --orders 2000]
+##            [--requests 300 --concurrency 10 --mode both] [--output results.json]
+##            [--compare baseline.json --threshold 0.25]
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYWORDS = ["chair", "lamp", "modern", "steel sofa", "smart speaker", "eco"]
+CATEGORIES = ["furniture", "appliances", "electronics", "kitchen", "garden"]
+
+
+class Scenario:
+    def __init__(self, name, build, auth=False, prepare=None):
+        self.name = name
+        self.build = build        # (rng, context) -> (method, url, request kwargs)
+        self.auth = auth
+        self.prepare = prepare    # untimed setup before each request
+
+
+async def fill_cart(client, headers, rng, context):
+    response = await client.post("/cart/", json={"product_id": rng.choice(context["product_ids"]), "quantity": 1}, headers=headers)
+    response.raise_for_status()
+
+
+SCENARIOS = [
+    Scenario("GET /products/", lambda rng, ctx: ("GET", "/products/", {"params": {"sort_by": "price", "page": rng.randint(1, 50)}})),
+    Scenario("GET /products/ (cursor, category)", lambda rng, ctx: ("GET", "/products/", {"params": {"cursor": "", "category": rng.choice(CATEGORIES), "sort_by": "price"}})),
+    Scenario("GET /products/{id}", lambda rng, ctx: ("GET", f"/products/{rng.choice(ctx['product_ids'])}", {})),
+    Scenario("GET /products/search", lambda rng, ctx: ("GET", "/products/search", {"params": {"keyword": rng.choice(KEYWORDS)}})),
+    Scenario("GET /cart/", lambda rng, ctx: ("GET", "/cart/", {}), auth=True),
+    Scenario("GET /orders/", lambda rng, ctx: ("GET", "/orders/", {}), auth=True),
+    Scenario("POST /checkout/", lambda rng, ctx: ("POST", "/checkout/", {}), auth=True, prepare=fill_cart),
+]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 1) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+async def run_scenario(client, scenario, context, requests, concurrency):
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker(number):
+        nonlocal remaining, errors
+        rng = random.Random(f"{scenario.name}-{number}")
+        headers = {"Authorization": f"Bearer {context['tokens'][number % len(context['tokens'])]}"} if scenario.auth else {}
+        while remaining > 0:
+            remaining -= 1
+            if scenario.prepare is not None:
+                await scenario.prepare(client, headers, rng, context)
+            method, url, kwargs = scenario.build(rng, context)
+            start = time.perf_counter()
+            response = await client.request(method, url, headers=headers, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def sign_in(client, count):
+    from seed_data import DATASET_PASSWORD
+    tokens = []
+    for i in range(count):
+        response = await client.post("/auth/signin", json={"email": f"user{i}@bench.example", "password": DATASET_PASSWORD})
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    return tokens
+
+
+async def run_all(client, context, args):
+    context["tokens"] = await sign_in(client, min(args.concurrency, args.users))
+    results = {}
+    for scenario in SCENARIOS:
+        await run_scenario(client, scenario, context, min(args.warmup, args.requests), args.concurrency)
+        results[scenario.name] = await run_scenario(client, scenario, context, args.requests, args.concurrency)
+        print(f"  {scenario.name:<36} {format_stats(results[scenario.name])}")
+    return results
+
+
+async def run_inprocess(context, args):
+    from app.main import app
+    from app.core.database import async_engine
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run_all(client, context, args)
+    finally:
+        if async_engine is not None:
+            await async_engine.dispose()
+
+
+async def run_uvicorn(context, args, workdir):
+    from benchmarks.async_load_benchmark import wait_ready
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            return await run_all(client, context, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def seed(args):
+    from sqlalchemy import select
+    from app.core.database import SessionLocal
+    from app.core.schema import create_schema
+    from app.products.models import Product
+    from seed_data import seed_dataset
+
+    start = time.perf_counter()
+    create_schema()
+    with SessionLocal() as db:
+        seed_dataset(db, args.users, args.products, args.orders, args.seed)
+        product_ids = db.scalars(select(Product.id)).all()
+    print(f"seeded {args.users} users, {args.products} products, {args.orders} orders in {time.perf_counter() - start:.1f}s")
+    return {"product_ids": product_ids}
+
+
+def format_stats(stats):
+    return (
+        f"rps {stats['rps']:8.1f} | p50 {stats['p50_ms']:7.2f} ms | p95 {stats['p95_ms']:7.2f} ms | "
+        f"p99 {stats['p99_ms']:7.2f} ms | errors {stats['errors']}"
+    )
+
+
+## regressions: p95 slower or rps lower than the baseline by more than `threshold`
+def compare(current, baseline, threshold):
+    regressions = []
+    for mode, endpoints in current["results"].items():
+        for name, stats in endpoints.items():
+            before = baseline.get("results", {}).get(mode, {}).get(name)
+            if before is None:
+                continue
+            p95_change = stats["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+            rps_change = stats["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+            flagged = p95_change > threshold or rps_change < -threshold
+            print(f"  {mode:<9} {name:<36} p95 {p95_change:+7.1%} | rps {rps_change:+7.1%}{'  REGRESSION' if flagged else ''}")
+            if flagged:
+                regressions.append(f"{mode} {name}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="both")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    ## scratch database; the app reads DATABASE_URL and writes logs/ relative to the cwd
+    workdir = tempfile.mkdtemp(prefix="ecommerce-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'ecommerce.db')}"
+    os.environ.setdefault("EMAIL_WORKER_ENABLED", "false")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")  # sign-ins of every benchmark user
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.makedirs(os.path.join(workdir, "logs"), exist_ok=True)
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+
+    context = seed(args)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {"users": args.users, "products": args.products, "orders": args.orders, "seed": args.seed},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "env": {key: os.environ[key] for key in ("ASYNC_DB", "JWT_BACKEND", "CATALOG_CACHE_TTL", "AUTH_CLAIMS_FAST_PATH") if key in os.environ},
+        },
+        "results": {},
+    }
+
+    if args.mode in ("inprocess", "both"):
+        print("in-process (ASGI transport)")
+        report["results"]["inprocess"] = asyncio.run(run_inprocess(context, args))
+    if args.mode in ("uvicorn", "both"):
+        print(f"uvicorn (127.0.0.1:{args.port})")
+        report["results"]["uvicorn"] = asyncio.run(run_uvicorn(context, args, workdir))
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f"compared with {baseline_path} (threshold {args.threshold:.0%})")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
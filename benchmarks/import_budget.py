@@ -0,0 +1,80 @@
+## Worker start-up check: imports app.main (which builds the app) in fresh interpreters
+## with `python -X importtime`. It fails when the fastest run exceeds the budget, or
+## when a module that should load on first use is imported at start-up
+## (bcrypt/passlib, jose's JWT code with cryptography, smtplib).
+## Prints the import time per top-level package of the fastest run.
+## usage: python -m benchmarks.import_budget [--budget-ms 1500] [--runs 5] [--top 12]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED = ("passlib.context", "bcrypt", "jose.jwt", "cryptography", "smtplib")
+
+
+## [(module, self_us, cumulative_us)] from the -X importtime report
+def parse_importtime(report: str):
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_part, name = line.split("|")
+        modules.append((name.strip(), int(self_part.split(":")[1]), int(cumulative_part)))
+    return modules
+
+
+def profile_once(workdir: str):
+    env = dict(os.environ, PYTHONPATH=ROOT, EMAIL_WORKER_ENABLED="false")
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"importing app.main failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of app.main")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        runs = [profile_once(workdir) for _ in range(args.runs)]
+
+    def total_us(modules):
+        return next(cumulative for name, _, cumulative in modules if name == "app.main")
+
+    fastest = min(runs, key=total_us)
+    total_ms = total_us(fastest) / 1000
+    per_package = defaultdict(int)
+    for name, self_us, _ in fastest:
+        per_package[name.split(".")[0]] += self_us
+
+    print(f"import app.main: {total_ms:.0f} ms (fastest of {args.runs}), budget {args.budget_ms:.0f} ms")
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<24} {self_us / 1000:8.1f} ms")
+
+    failures = []
+    imported = {name for name, _, _ in fastest}
+    for module in DEFERRED:
+        if module in imported:
+            failures.append(f"{module} is imported at start-up")
+    if total_ms > args.budget_ms:
+        failures.append(f"import took {total_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("start-up import within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+## Requests/second on GET /products/ with the previous logging setup
+## (BaseHTTPMiddleware + synchronous FileHandler on the request path) vs the
+## current one (pure ASGI middleware + QueueHandler/QueueListener).
+## usage: python -m benchmarks.logging_benchmark [concurrency...]   (default 10 50)
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import httpx
+from fastapi import Request
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from benchmarks.async_load_benchmark import ROOT, PORT, seed, wait_ready, drive
+
+logger = logging.getLogger("ecommerce_logger")
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        logger.info(f"{request.client.host} - {request.method} {request.url.path}")
+        response = await call_next(request)
+        return response
+
+
+## app.main with the old middleware and handlers swapped back in (uvicorn --factory)
+def legacy_app():
+    from app.main import app
+    from app.core.logging_config import stop_logging
+
+    stop_logging()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        handlers=[logging.FileHandler("logs/log_file.log"), logging.StreamHandler()],
+        force=True,
+    )
+    app.user_middleware = [Middleware(LegacyLoggingMiddleware)]
+    app.middleware_stack = None
+    return app
+
+
+def start_server(workdir, target, factory):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    os.makedirs(os.path.join(workdir, "logs"), exist_ok=True)
+    command = [sys.executable, "-m", "uvicorn", target, "--port", str(PORT), "--log-level", "warning"]
+    if factory:
+        command.append("--factory")
+    return subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def measure(target, factory, levels):
+    with tempfile.TemporaryDirectory() as workdir:
+        seed(workdir)
+        server = start_server(workdir, target, factory)
+        try:
+            limits = httpx.Limits(max_connections=max(levels))
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+                await wait_ready(client)
+                await drive(client, 10)  # warm-up
+                return {level: await drive(client, level) for level in levels}
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    levels = [int(arg) for arg in sys.argv[1:]] or [10, 50]
+    before = asyncio.run(measure("benchmarks.logging_benchmark:legacy_app", True, levels))
+    after = asyncio.run(measure("app.main:app", False, levels))
+    print(f"{'concurrency':>11} | {'before rps':>10} | {'after rps':>9}")
+    for level in levels:
+        print(f"{level:>11} | {before[level]:10.1f} | {after[level]:9.1f}")
@@ -0,0 +1,112 @@
+## Query budget check: calls one or more routes of every router against a small seeded
+## database with QUERY_PROFILING on and fails when a route runs more SQL statements than
+## its budget (read from the X-Query-Count response header). Budgets are the current
+## counts; an N+1 (a query per order item, cart line, ...) shows up as a count that
+## grows with the dataset, so the cart/order fixtures hold several lines each.
+## Response caches are disabled so every call reaches the database.
+## usage: python -m benchmarks.query_budget        (ASYNC_DB=1 for the async engine)
+import os
+import sys
+import tempfile
+
+WORKDIR = tempfile.mkdtemp(prefix="query_budget_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'budget.db')}"
+os.environ["QUERY_PROFILING"] = "true"
+os.environ["CATALOG_CACHE_TTL"] = "0"
+os.environ["IDENTITY_CACHE_TTL"] = "0"
+os.environ["TOKEN_CACHE_SIZE"] = "0"
+os.environ["EMAIL_WORKER_ENABLED"] = "false"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.makedirs(os.path.join(WORKDIR, "logs"), exist_ok=True)
+os.chdir(WORKDIR)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+
+def query_count(response):
+    return int(response.headers["X-Query-Count"])
+
+
+## fails when `response` ran more than `budget` statements (needs QUERY_PROFILING)
+def assert_query_budget(response, budget: int, label: str = ""):
+    count = query_count(response)
+    assert count <= budget, f"{label or response.request.url}: {count} queries, budget {budget}"
+    return count
+
+
+## (router, method, url, request kwargs, who, budget); who: None, "user" or "admin"
+BUDGETS = [
+    ("auth", "POST", "/auth/signin", {"json": {"email": "user1@bench.example", "password": "Passw0rd!"}}, None, 1),
+    ("auth", "POST", "/auth/forgot-password", {"json": {"email": "user1@bench.example"}}, None, 3),
+    ("products", "GET", "/products/", {"params": {"sort_by": "price", "category": "kitchen"}}, None, 1),
+    ("products", "GET", "/products/", {"params": {"cursor": "", "sort_by": "price"}}, None, 1),
+    ("products", "GET", "/products/search", {"params": {"keyword": "chair"}}, None, 1),
+    ("products", "GET", "/products/1", {}, None, 1),
+    ("admin", "GET", "/admin/products/", {}, "admin", 2),
+    ("admin", "PUT", "/admin/products/2", {"json": {"price": 10.0}}, "admin", 4),
+    ("cart", "GET", "/cart/", {}, "user", 2),
+    ("cart", "GET", "/cart/priced", {}, "user", 2),
+    ("cart", "POST", "/cart/", {"json": {"product_id": 3, "quantity": 1}}, "user", 2),
+    ("cart", "POST", "/cart/batch", {"json": {"operations": [{"op": "add", "product_id": 4, "quantity": 1}, {"op": "set", "product_id": 5, "quantity": 2}]}}, "user", 3),
+    ("cart", "PUT", "/cart/3", {"json": {"quantity": 2}}, "user", 2),
+    ("cart", "DELETE", "/cart/3", {}, "user", 3),
+    ("orders", "GET", "/orders/", {}, "user", 3),
+    ("orders", "GET", "/orders/summary", {}, "user", 2),
+    ("checkout", "POST", "/checkout/", {}, "user", 7),
+]
+
+
+def seed():
+    from app.core.database import SessionLocal
+    from app.core.schema import create_schema
+    from app.auth.models import User
+    from seed_data import seed_dataset
+    create_schema()
+    with SessionLocal() as db:
+        seed_dataset(db, users=5, products=200, orders=40, seed=7)
+        db.execute(update(User).where(User.email == "user0@bench.example").values(role="admin"))
+        db.commit()
+
+
+def sign_in(client, email):
+    response = client.post("/auth/signin", json={"email": email, "password": "Passw0rd!"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def main():
+    from app.main import app
+    seed()
+    failures = []
+    with TestClient(app) as client:
+        headers = {None: {}, "admin": sign_in(client, "user0@bench.example"), "user": sign_in(client, "user1@bench.example")}
+        ## a multi-line cart, so per-line queries would exceed the budgets
+        for product_id in range(10, 16):
+            client.post("/cart/", json={"product_id": product_id, "quantity": 1}, headers=headers["user"]).raise_for_status()
+
+        for router, method, url, kwargs, who, budget in BUDGETS:
+            response = client.request(method, url, headers=headers[who], **kwargs)
+            label = f"{method} {url}"
+            try:
+                count = assert_query_budget(response, budget, label)
+                verdict = "ok"
+            except AssertionError as e:
+                count = query_count(response)
+                verdict = "OVER BUDGET"
+                failures.append(str(e))
+            if response.status_code >= 400:
+                verdict = f"HTTP {response.status_code}"
+                failures.append(f"{label}: HTTP {response.status_code}")
+            print(f"  {router:<9} {label:<28} {count:>3} / {budget:<3} {response.headers['X-Query-Time-Ms']:>8} ms  {verdict}")
+
+    if failures:
+        print(f"{len(failures)} failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("all routes within their query budget")
+
+
+if __name__ == "__main__":
+    main()
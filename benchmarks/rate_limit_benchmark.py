@@ -0,0 +1,67 @@
+## Per-request cost of the auth rate limiter itself, without the app behind it:
+##   store.take           one token-bucket check (memory store), and the shared store
+##                        on the in-process memory backend (no network round trip)
+##   middleware           a POST /auth/signin through RateLimitMiddleware (IP check,
+##                        body read and replay, email check) vs the same request
+##                        straight to a no-op ASGI app
+##   rejection            a request answered with 429 + Retry-After
+## usage: python -m benchmarks.rate_limit_benchmark [iterations]   (default 50000)
+import asyncio
+import json
+import sys
+import time
+from app.core.cache import MemoryBackend
+from app.core.rate_limit import MemoryRateLimitStore, SharedRateLimitStore
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware, RoutePolicy
+
+BODY = json.dumps({"email": "user1@bench.example", "password": "Passw0rd!"}).encode()
+UNLIMITED = (10**12, 1.0)
+
+
+async def noop_app(scope, receive, send):
+    await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def request_scope(ip: str):
+    return {"type": "http", "method": "POST", "path": "/auth/signin", "headers": [], "client": (ip, 40000)}
+
+
+async def receive():
+    return {"type": "http.request", "body": BODY, "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def per_call_us(call, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        await call(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations):
+    memory = MemoryRateLimitStore(100000)
+    shared = SharedRateLimitStore(MemoryBackend(100000))
+    print(f"per request, {iterations} iterations")
+    print(f"  store.take memory             {await per_call_us(lambda i: memory.take(f'ip:{i % 1000}', *UNLIMITED), iterations):7.2f} us")
+    print(f"  store.take shared (in-proc)   {await per_call_us(lambda i: shared.take(f'ip:{i % 1000}', *UNLIMITED), iterations):7.2f} us")
+
+    policies = {"/auth/signin": RoutePolicy("signin", UNLIMITED, UNLIMITED)}
+    limited = RateLimitMiddleware(noop_app, store=MemoryRateLimitStore(100000), policies=policies)
+    bare = await per_call_us(lambda i: noop_app(request_scope(f"10.0.{i % 250}.1"), receive, send), iterations)
+    wrapped = await per_call_us(lambda i: limited(request_scope(f"10.0.{i % 250}.1"), receive, send), iterations)
+    print(f"  no-op app                     {bare:7.2f} us")
+    print(f"  no-op app + rate limiter      {wrapped:7.2f} us   (+{wrapped - bare:.2f} us)")
+
+    policies = {"/auth/signin": RoutePolicy("signin", (1, 3600.0))}
+    rejecting = RateLimitMiddleware(noop_app, store=MemoryRateLimitStore(100000), policies=policies)
+    await rejecting(request_scope("10.9.9.9"), receive, send)
+    print(f"  rejection (429)               {await per_call_us(lambda i: rejecting(request_scope('10.9.9.9'), receive, send), iterations // 10):7.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000))
@@ -0,0 +1,184 @@
+## Multi-worker scaling of the catalog endpoints. Seeds a scratch database, then for
+## each worker count starts `python -m app.serve` and drives GET /products/,
+## /products/search and /products/{id} from several client processes for a fixed
+## time. Reports requests/second, p50/p95 latency and the scaling efficiency
+## (rps / (workers * rps with 1 worker)). Workers share the catalog cache through
+## CACHE_BACKEND=sqlite, or redis (a local fakeredis stand-in is started for it).
+## Clients run on the same machine, so the numbers are only meaningful with more
+## cores than workers + clients.
+## usage: python -m benchmarks.scaling_benchmark [--workers 1 2 4 8] [--backend sqlite|redis]
+##            [--clients 4 --concurrency 16 --duration 10] [--no-cache] [--output scaling.json]
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="scaling_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}"
+os.environ["EMAIL_WORKER_ENABLED"] = "false"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.makedirs(os.path.join(WORKDIR, "logs"), exist_ok=True)
+
+import httpx
+
+KEYWORDS = ("chair", "lamp", "phone", "table", "shirt")
+CATEGORIES = ("kitchen", "electronics", "fashion", "books", "garden")
+
+
+def catalog_path(product_ids):
+    choice = random.random()
+    if choice < 0.4:
+        return f"/products/?page_size=20&sort_by=price&category={random.choice(CATEGORIES)}"
+    if choice < 0.6:
+        return f"/products/search?keyword={random.choice(KEYWORDS)}"
+    return f"/products/{random.choice(product_ids)}"
+
+
+async def drive(base_url, product_ids, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def loop(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(catalog_path(product_ids))
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await asyncio.gather(*(loop(client) for _ in range(concurrency)))
+    return latencies, errors
+
+
+## one client process
+def run_client(base_url, product_ids, concurrency, duration, seed):
+    random.seed(seed)
+    return asyncio.run(drive(base_url, product_ids, concurrency, duration))
+
+
+def wait_ready(base_url, server):
+    for _ in range(300):
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def measure(workers, args, product_ids, env):
+    port = args.port + workers
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve"],
+        cwd=WORKDIR, env=dict(env, WORKERS=str(workers), PORT=str(port)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base_url, server)
+        with ProcessPoolExecutor(args.clients) as pool:
+            ## warm-up: every worker has booted and the cache holds the hot keys
+            list(pool.map(run_client, *zip(*[(base_url, product_ids, args.concurrency, 1.0, i) for i in range(args.clients)])))
+            start = time.perf_counter()
+            results = list(pool.map(run_client, *zip(*[
+                (base_url, product_ids, args.concurrency, args.duration, 100 + i) for i in range(args.clients)
+            ])))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+def seed(args):
+    from sqlalchemy import select
+    from app.core.database import SessionLocal
+    from app.core.schema import create_schema
+    from app.products.models import Product
+    from seed_data import seed_dataset
+    create_schema()
+    with SessionLocal() as db:
+        seed_dataset(db, users=2, products=args.products, orders=0)
+        return db.scalars(select(Product.id)).all()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Catalog throughput at 1..N workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--backend", choices=["sqlite", "redis"], default="sqlite")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per client process")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per worker count")
+    parser.add_argument("--no-cache", action="store_true", help="CATALOG_CACHE_TTL=0: every request queries the database")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--output", help="write the results as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    os.chdir(WORKDIR)
+    product_ids = seed(args)
+
+    env = dict(os.environ, PYTHONPATH=ROOT, CACHE_BACKEND=args.backend,
+               CACHE_SQLITE_PATH=os.path.join(WORKDIR, "shared_state.db"))
+    if args.no_cache:
+        env["CATALOG_CACHE_TTL"] = "0"
+    fake_redis = None
+    if args.backend == "redis":
+        from benchmarks.fake_redis_server import start
+        fake_redis = start(port=args.port)
+        env["CACHE_URL"] = f"redis://127.0.0.1:{args.port}/0"
+
+    print(f"{os.cpu_count()} CPU(s), backend {args.backend}, cache {'off' if args.no_cache else 'on'}, "
+          f"{args.clients} clients x {args.concurrency} connections, {args.duration:.0f}s per run")
+    results = []
+    try:
+        for workers in args.workers:
+            stats = measure(workers, args, product_ids, env)
+            baseline = results[0]["rps"] / results[0]["workers"] if results else stats["rps"] / workers
+            stats["efficiency"] = stats["rps"] / (workers * baseline)
+            results.append(stats)
+            print(
+                f"  {workers:>2} worker(s)  rps {stats['rps']:8.1f} | p50 {stats['p50_ms']:7.2f} ms | "
+                f"p95 {stats['p95_ms']:7.2f} ms | efficiency {stats['efficiency']:6.1%} | errors {stats['errors']}"
+            )
+    finally:
+        if fake_redis is not None:
+            fake_redis.shutdown()
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"cpu_count": os.cpu_count(), "backend": args.backend, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+## Compare /products/search latency: old LIKE '%kw%' scan vs the FTS5 index.
+## usage: python -m benchmarks.search_benchmark [sizes...]   (default 10000 100000 1000000)
+import asyncio
+import os
+import sys
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, text, func, or_
+from sqlalchemy.orm import sessionmaker
+from app.core.database import SyncSessionAdapter
+from app.core.schema import create_schema
+from app.products.models import Product
+from app.products import search
+from app.auth import models as auth_models
+from app.cart import models as cart_models
+from app.orders import models as order_models
+
+WORDS = [
+    "wooden", "steel", "chair", "table", "sofa", "kettle", "fan", "lamp", "desk", "bed",
+    "cotton", "leather", "glass", "modern", "classic", "compact", "portable", "premium",
+    "electric", "manual", "outdoor", "kitchen", "office", "garden", "storage", "shelf",
+]
+## filler vocabulary so the named words above stay selective, like in a real catalog
+FILLER = [f"{a}{b}{c}" for a in "bcdfgklmnprstvz" for b in "aeiou" for c in ("ran", "lex", "tor", "mid", "son")]
+KEYWORDS = ["chair", "steel kettle", "portab", "leather sofa", "garden"]
+RUNS = 20
+
+
+def seed(engine, size):
+    random.seed(42)
+    with engine.begin() as conn:
+        rows = []
+        for i in range(size):
+            rows.append({
+                "name": " ".join(random.choices(FILLER, k=2) + random.choices(WORDS, k=1)) + f" {i}",
+                "description": " ".join(random.choices(FILLER, k=12) + random.choices(WORDS, k=1)),
+                "price": round(random.uniform(1, 10000), 2),
+                "stock": random.randint(0, 100),
+                "category": random.choice(["Furniture", "Appliances", "Decor"]),
+                "image_url": "https://example.jpg",
+            })
+            if len(rows) == 10000:
+                conn.execute(Product.__table__.insert(), rows)
+                rows = []
+        if rows:
+            conn.execute(Product.__table__.insert(), rows)
+
+
+## the previous /products/search implementation (full scan, no limit)
+def like_search(session, keyword):
+    keyword = keyword.lower()
+    return session.query(Product).filter(
+        or_(
+            func.lower(Product.name).like(f"%{keyword}%"),
+            func.lower(Product.description).like(f"%{keyword}%")
+        )
+    ).all()
+
+
+async def timed(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+async def run(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        create_schema(bind=engine)
+        seed(engine, size)
+        db = SyncSessionAdapter(sessionmaker(bind=engine)())
+
+        print(f"\n{size:>9} products")
+        for keyword in KEYWORDS:
+            like_p50, like_p95 = await timed(lambda: db.run_sync(like_search, keyword))
+            fts_p50, fts_p95 = await timed(lambda: search.search_products(db, keyword))
+            print(f"  {keyword!r:16} LIKE p50={like_p50:8.2f}ms p95={like_p95:8.2f}ms | "
+                  f"FTS p50={fts_p50:7.2f}ms p95={fts_p95:7.2f}ms")
+        await db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        asyncio.run(run(size))
@@ -0,0 +1,113 @@
+## Serialization cost of list pages at 100 and 1,000 items, in a scratch SQLite database.
+## Per page size it times query + encoding for:
+##   orm + response_model   ORM objects validated with from_attributes, dumped to python
+##                          and encoded with json.dumps (FastAPI's response_model path)
+##   orm + TypeAdapter      ORM objects validated and dumped to JSON by pydantic-core
+##   rows + dumps           schema columns only, rows encoded by app.utils.serialization
+## and then requests/second of GET /products/ and GET /admin/products/ through the app.
+## usage: python -m benchmarks.serialization_benchmark [rounds]   (default 200)
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="serialization_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}"
+os.environ["CATALOG_CACHE_TTL"] = "0"
+os.environ["EMAIL_WORKER_ENABLED"] = "false"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.makedirs(os.path.join(WORKDIR, "logs"), exist_ok=True)
+os.chdir(WORKDIR)
+
+import httpx
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from app.main import app
+from app.core.database import SessionLocal
+from app.core.schema import create_schema
+from app.auth import utils
+from app.auth.models import User
+from app.products.models import Product
+from app.products.schemas import ProductOut
+from app.products.search import PRODUCT_COLUMNS
+from app.utils import serialization
+from seed_data import seed_dataset
+
+PAGE_SIZES = (100, 1000)
+PRODUCT_LIST = TypeAdapter(list[ProductOut])
+
+
+def response_model_path(db, size):
+    products = db.scalars(select(Product).limit(size)).all()
+    validated = PRODUCT_LIST.validate_python(products, from_attributes=True)
+    content = PRODUCT_LIST.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def type_adapter_path(db, size):
+    products = db.scalars(select(Product).limit(size)).all()
+    return PRODUCT_LIST.dump_json(PRODUCT_LIST.validate_python(products, from_attributes=True))
+
+
+def rows_path(db, size):
+    rows = db.execute(select(*PRODUCT_COLUMNS).limit(size)).all()
+    return serialization.dumps(serialization.rows_to_dicts(rows))
+
+
+def per_call_ms(fn, size, rounds):
+    with SessionLocal() as db:
+        fn(db, size)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn(db, size)
+            db.expunge_all()
+        return (time.perf_counter() - start) / rounds * 1000
+
+
+async def requests_per_second(client, url, params, headers, rounds):
+    await client.get(url, params=params, headers=headers)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        response = await client.get(url, params=params, headers=headers)
+        response.raise_for_status()
+    return rounds / (time.perf_counter() - start)
+
+
+async def endpoints(rounds):
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.email == "user0@bench.example").values(role="admin"))
+        db.commit()
+    admin = {"Authorization": f"Bearer {utils.create_access_token({'sub': 'user0@bench.example', 'role': 'admin'})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in PAGE_SIZES:
+            public = await requests_per_second(client, "/products/", {"page_size": size}, {}, rounds)
+            admin_rps = await requests_per_second(client, "/admin/products/", {"limit": size}, admin, rounds)
+            print(f"  {size:>5} items   GET /products/ {public:8.1f} req/s   GET /admin/products/ {admin_rps:8.1f} req/s")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    create_schema()
+    with SessionLocal() as db:
+        seed_dataset(db, users=2, products=max(PAGE_SIZES), orders=0)
+
+    encoder = "orjson" if serialization.orjson is not None else "pydantic-core"
+    print(f"query + encode per page ({encoder}, {rounds} rounds)")
+    for size in PAGE_SIZES:
+        legacy = per_call_ms(response_model_path, size, rounds)
+        adapter = per_call_ms(type_adapter_path, size, rounds)
+        rows = per_call_ms(rows_path, size, rounds)
+        print(
+            f"  {size:>5} items   orm + response_model {legacy:7.2f} ms   orm + TypeAdapter {adapter:7.2f} ms   "
+            f"rows + dumps {rows:7.2f} ms   ({legacy / rows:.1f}x)"
+        )
+
+    print("through the app (in-process)")
+    asyncio.run(endpoints(max(1, rounds // 4)))
+
+
+if __name__ == "__main__":
+    main()
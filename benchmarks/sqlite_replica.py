@@ -0,0 +1,37 @@
+## Local stand-in for a streaming replica: copies a primary SQLite database into a
+## replica file every --interval seconds with SQLite's online backup API, so reads
+## from the replica lag the primary by up to that interval.
+## usage: python -m benchmarks.sqlite_replica primary.db replica.db [--interval 2]
+##        DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS=sqlite:///replica.db uvicorn app.main:app
+import argparse
+import sqlite3
+import time
+
+
+def sync(primary_path: str, replica_path: str):
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy a SQLite primary to a replica file periodically")
+    parser.add_argument("primary")
+    parser.add_argument("replica")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds of replication lag")
+    parser.add_argument("--once", action="store_true", help="copy once and exit")
+    args = parser.parse_args()
+
+    while True:
+        sync(args.primary, args.replica)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
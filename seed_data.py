@@ -1,8 +1,12 @@
+import argparse
+import random
+from sqlalchemy import insert, select
 from app.core.database import SessionLocal
-from app.products.models import Product
-
-# Create DB session
-db = SessionLocal()
+from app.products.models import Product, normalize_category
+from app.auth.models import User
+from app.auth.utils import hash_password
+from app.cart import models as cart_models
+from app.orders.models import Order, OrderItem, OrderStatus
 
 # Sample furniture and common products
 sample_products = [
@@ -48,12 +52,100 @@ sample_products = [
     },
 ]
 
-# Insert into DB
-for prod in sample_products:
-    product = Product(**prod)
-    db.add(product)
+## generated dataset (benchmarks): every generated user has this password
+DATASET_PASSWORD = "Passw0rd!"
+CATEGORIES = ["Furniture", "Appliances", "Electronics", "Kitchen", "Garden", "Toys", "Books", "Sports"]
+WORDS = ["wooden", "steel", "modern", "classic", "compact", "portable", "smart", "premium", "eco", "deluxe"]
+NOUNS = ["table", "chair", "lamp", "kettle", "fan", "shelf", "desk", "sofa", "blender", "speaker"]
+BATCH = 5000
+
+
+def seed_samples(db):
+    for prod in sample_products:
+        db.add(Product(**prod))
+    db.commit()
+
+
+def insert_batched(db, table, rows):
+    for start in range(0, len(rows), BATCH):
+        db.execute(insert(table), rows[start:start + BATCH])
+
+
+## N users, M products and K orders (1-3 items each) with bulk inserts; deterministic per seed
+def seed_dataset(db, users: int, products: int, orders: int, seed: int = 42):
+    rng = random.Random(seed)
+    hashed = hash_password(DATASET_PASSWORD)  # one bcrypt hash shared by all generated users
+
+    insert_batched(db, User.__table__, [
+        {"name": f"Bench User {i}", "email": f"user{i}@bench.example", "hashed_password": hashed, "role": "user"}
+        for i in range(users)
+    ])
+
+    product_rows = []
+    for i in range(products):
+        category = rng.choice(CATEGORIES)
+        name = f"{rng.choice(WORDS).title()} {rng.choice(NOUNS).title()} {i}"
+        product_rows.append({
+            "name": name,
+            "description": f"{rng.choice(WORDS)} {rng.choice(NOUNS)} for everyday use",
+            "price": round(rng.uniform(5, 20000), 2),
+            "stock": rng.randint(50, 500),
+            "category": category,
+            "category_key": normalize_category(category),
+            "image_url": f"https://images.example/{i}.jpg",
+        })
+    insert_batched(db, Product.__table__, product_rows)
+    db.commit()
+
+    user_ids = db.scalars(select(User.id).where(User.email.like("%@bench.example"))).all()
+    product_ids = db.scalars(select(Product.id)).all()
+    prices = dict(db.execute(select(Product.id, Product.price)).all())
+    names = dict(db.execute(select(Product.id, Product.name)).all())
+
+    for start in range(0, orders, BATCH):
+        count = min(BATCH, orders - start)
+        baskets = [
+            [(product_id, rng.randint(1, 3)) for product_id in rng.sample(product_ids, rng.randint(1, min(3, len(product_ids))))]
+            for _ in range(count)
+        ]
+        order_ids = db.scalars(insert(Order.__table__).returning(Order.__table__.c.id, sort_by_parameter_order=True), [
+            {
+                "user_id": rng.choice(user_ids),
+                "status": OrderStatus.PAID,
+                "total_amount": round(sum(prices[product_id] * quantity for product_id, quantity in basket), 2),
+            }
+            for basket in baskets
+        ]).all()
+        insert_batched(db, OrderItem.__table__, [
+            {
+                "order_id": order_id,
+                "product_id": product_id,
+                "product_name": names[product_id],
+                "quantity": quantity,
+                "price_at_purchase": prices[product_id],
+            }
+            for order_id, basket in zip(order_ids, baskets)
+            for product_id, quantity in basket
+        ])
+        db.commit()
+
 
-db.commit()
-db.close()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the database (sample products by default)")
+    parser.add_argument("--users", type=int, default=0, help="generated users (user<i>@bench.example)")
+    parser.add_argument("--products", type=int, default=0, help="generated products")
+    parser.add_argument("--orders", type=int, default=0, help="generated orders")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
 
-print("✅ Sample products seeded.")
+    # Create DB session
+    db = SessionLocal()
+    if args.users or args.products or args.orders:
+        if args.orders and not (args.users and args.products):
+            parser.error("--orders needs --users and --products")
+        seed_dataset(db, args.users, args.products, args.orders, args.seed)
+        print(f"✅ Seeded {args.users} users, {args.products} products, {args.orders} orders.")
+    else:
+        seed_samples(db)
+        print("✅ Sample products seeded.")
+    db.close()